@@ -3,57 +3,61 @@
 Data Quality checks
 """
 
+from sqlalchemy import text
 
-def check_nulls(df, required_columns, logger):
-    """
 
-    :param df:
-    :param required_columns:
-    :param logger:
-    :return:
-    """
-    for col in required_columns:
-        if df[col].isnull().any():
-            raise ValueError(f"Null values found in required column: {col}")
-    logger.info("Null check passed")
+EXPECTED_SCHEMA = {
+    "order_id": "int64",
+    "order_date": "datetime64[ns]",
+    "customer_id": "int64",
+    "product": "category",
+    "quantity": "int32",
+    "price": "float64",
+    "revenue": "float64",
+}
 
 
-def check_ranges(df, logger):
+def check_staging_quality(engine, schema, staging_table, logger):
     """
+    Run the null, range and duplicate checks inside PostgreSQL on the freshly loaded staging table.
+
+    Rules: no NULL in any EXPECTED_SCHEMA column, quantity > 0, price > 0, no repeated order_id. All counters are
+    aggregates of one scan over the staging table, evaluated in a single round trip. Must run before the staging rows
+    are merged into the target, a ValueError stops the load.
 
-    :param df:
+    duplicate_count counts the extra rows per repeated order_id (3 rows with the same order_id count as 2).
+
+    :param engine:
+    :param schema:
+    :param staging_table:
     :param logger:
     :return:
     """
-    if (df["quantity"] <= 0).any():
+    null_condition = " OR ".join(f"{col} IS NULL" for col in EXPECTED_SCHEMA)
+
+    query = text(f"""
+        SELECT
+            COALESCE(SUM(CASE WHEN {null_condition} THEN 1 ELSE 0 END), 0) AS null_count,
+            COALESCE(SUM(CASE WHEN quantity <= 0 THEN 1 ELSE 0 END), 0) AS quantity_count,
+            COALESCE(SUM(CASE WHEN price <= 0 THEN 1 ELSE 0 END), 0) AS price_count,
+            COUNT(order_id) - COUNT(DISTINCT order_id) AS duplicate_count
+        FROM {schema}.{staging_table}
+        """)
+
+    with engine.connect() as conn:
+        result = conn.execute(query).mappings().one()
+
+    if result["null_count"] > 0:
+        raise ValueError(f"Null values found in required columns: {result['null_count']} row(s)")
+    logger.info("Null check passed")
+
+    if result["quantity_count"] > 0:
         raise ValueError("Quantity must be > 0")
 
-    if (df["price"] <= 0).any():
+    if result["price_count"] > 0:
         raise ValueError("Price must be > 0")
-
     logger.info("Range checks passed")
 
-
-def check_duplicates(df, logger):
-    """
-
-    :param df:
-    :param logger:
-    :return:
-    """
-    dup_count = df.duplicated(subset=["order_id"]).sum()
-    if dup_count > 0:
-        raise ValueError(f"Duplicate order_id found: {dup_count}")
+    if result["duplicate_count"] > 0:
+        raise ValueError(f"Duplicate order_id found: {result['duplicate_count']}")
     logger.info("Duplicate check passed")
-
-
-
-EXPECTED_SCHEMA = {
-    "order_id": "int64",
-    "order_date": "datetime64[ns]",
-    "customer_id": "int64",
-    "product": "object",
-    "quantity": "int64",
-    "price": "float64",
-    "revenue": "float64",
-}
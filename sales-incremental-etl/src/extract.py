@@ -4,6 +4,17 @@
 # IMPORTS
 # =========================
 
+import csv
+# csv is a STANDARD PYTHON LIBRARY
+# csv.Sniffer is used to detect the delimiter of the raw file once, before pandas parses it
+
+import io
+# io is a STANDARD PYTHON LIBRARY
+# io.StringIO lets pandas re-parse an in-memory string as if it were a file
+
+import numpy as np
+# numpy is the third-party array library pandas is built on, used for the incremental filter mask
+
 import pandas as pd
 # pandas is a third-party library used for data manipulation and analysis
 # pd.read_csv() will be used to read CSV files into DataFrames
@@ -13,16 +24,51 @@ from pathlib import Path
 # Path is used for safe and OS-independent file path handling
 
 from utils import  get_project_root, load_config, setup_logging
+from checkpoints import EXPECTED_SCHEMA
 from typing import Dict
 
 # load_config -> our custom function from utils.py
 # setup_logging -> our custom logging setup function
 
+# Columns the raw file must carry, "revenue" is derived later in transform_data()
+# Derived from EXPECTED_SCHEMA once at import so both stay in sync
+EXPECTED_COLUMNS = frozenset(EXPECTED_SCHEMA).difference({"revenue"})
+
+# Bytes read from the head of the file to detect the delimiter
+SNIFF_SAMPLE_BYTES = 64 * 1024
+
+# Rows parsed per read_csv chunk, the incremental filter is applied chunk by chunk
+EXTRACT_CHUNK_SIZE = 500_000
+
+
+def _sniff_delimiter(raw_data_path: Path, logger) -> str:
+    """
+    Detect the delimiter of the raw CSV file from its first few KB.
+
+    pandas can only detect the delimiter itself (sep=None) with the slow python engine, so we detect it once here
+    and hand an explicit separator to the C engine instead.
+
+    :param raw_data_path: Path to raw CSV file.
+    :param logger: logging in-case of errors or success
+    :return: str: Detected delimiter, "," when it cannot be detected
+    """
+    with open(raw_data_path, "rb") as file:
+        sample = file.read(SNIFF_SAMPLE_BYTES)
+
+    try:
+        # errors="ignore" in case the sample ends in the middle of a multibyte character
+        dialect = csv.Sniffer().sniff(sample.decode("utf-8-sig", errors="ignore"), delimiters=",;\t|")
+        return dialect.delimiter
+    except csv.Error:
+        logger.warning("Could not detect CSV delimiter, defaulting to ','")
+        return ","
+
+
 # =========================
 # EXTRACT FUNCTION
 # =========================
 
-def extract_data(config: dict, logger) -> pd.DataFrame:
+def extract_data(config: dict, logger, last_watermark=None) -> pd.DataFrame:
     """
     The below green part is known as DocString of a function, which provides the clarity for the purpose & usage of it.
     "pd.DataFrame" after a sign "->" is known as  return annotation or a return type hint of a function. (Shared below).
@@ -46,8 +92,12 @@ def extract_data(config: dict, logger) -> pd.DataFrame:
     pd.dataframe is a return type of this function which is a part of pandas (third party library for python DA)
     Extract raw sales data from CSV file.
 
+    When last_watermark is given, only rows with order_date > last_watermark are kept. The file is read in chunks
+    and every chunk is filtered as soon as it is parsed, so rows that are already loaded never pile up in memory.
+
     :param config: Path to config file.
     :param logger: logging in-case of errors or success
+    :param last_watermark: Last loaded order_date in the target table, None loads everything.
     :return: pandas.DataFrame: Raw sales data
     """
     logger.info("Starting data extraction step")
@@ -78,47 +128,120 @@ def extract_data(config: dict, logger) -> pd.DataFrame:
         # pd.read_csv() is from pandas library
         # It reads CSV file and returns a DataFrame
         # Added seperator since we saw an error where csv was reading in different format or was saved in different
-        # format
-
-        df = pd.read_csv(raw_data_path, sep=None, engine="python", encoding="utf-8-sig")
-
-        # =========================
-        # HEADER NORMALIZATION
-        # =========================
-
-        # Case: Entire row is packed into first column (Excel corruption)
-        if len(df.columns) <= 2 and "," in df.columns[0]:
-            logger.warning(
-                "Detected malformed CSV structure. Normalizing columns and data."
+        # format. The separator is sniffed once up front so parsing can run on the C engine.
+        # Types are not pinned here, raw files carry blank quantities, "2.0" style numbers and string customer ids,
+        # transform_data() does the coercion.
+
+        sep = _sniff_delimiter(raw_data_path, logger)
+        logger.info(f"Detected CSV delimiter: {sep!r}")
+
+        # -------------------------
+        # TYPE NORMALIZATION (CRITICAL)
+        # Because we were seeing an error earlier when comparing the data from pandas "df" dataset order date
+        # with sql max of order date
+        # -------------------------
+
+        if last_watermark is not None:
+            last_watermark = pd.to_datetime(last_watermark)
+            logger.info(
+                f"Watermark/Incremental value normalized to pandas Timestamp: {last_watermark}"
             )
 
-            # Extract correct column names
-            corrected_columns = df.columns[0].split(",")
-
-            # Split the single column into multiple columns
-            df = df[df.columns[0]].str.split(",", expand=True)
-
-            # Assign corrected column names
-            df.columns = corrected_columns
-
-            logger.info(f"Corrected columns after normalization: {df.columns.tolist()}")
+            # numpy datetime64 version, compared directly against the raw datetime64 buffer of every chunk
+            watermark_datetime64 = last_watermark.to_datetime64()
 
-        # Schema validation (production mindset)
-        expected_columns = {
-            "order_id", "order_date", "customer_id",
-            "product", "quantity", "price"
-        }
-
-        actual_columns = set(df.columns)
+        reader = pd.read_csv(
+            raw_data_path, sep=sep, engine="c", encoding="utf-8-sig", chunksize=EXTRACT_CHUNK_SIZE
+        )
 
-        # Cross Validating expected columns with columns that got fetched from file
-        if not (expected_columns.issubset(actual_columns)):
-            # if not (expected_columns.issubset(df.corrected_columns)):
-            logger.error(f"CSV Schema mismatched error")
-            logger.error(f"Expected columns: {expected_columns}")
-            logger.error(f"Actual columns: {actual_columns}")
+        chunks = []
+        total_rows = 0
+        invalid_date_count = 0
+
+        for chunk_number, chunk in enumerate(reader):
+
+            # =========================
+            # HEADER NORMALIZATION
+            # =========================
+
+            # Case: Entire row is packed into first column (Excel corruption)
+            if len(chunk.columns) <= 2 and "," in chunk.columns[0]:
+                if chunk_number == 0:
+                    logger.warning(
+                        "Detected malformed CSV structure. Normalizing columns and data."
+                    )
+
+                # The packed column name is the real header line and every value is a real data line
+                packed_header = chunk.columns[0]
+                packed_rows = chunk[packed_header].str.cat(sep="\n")
+
+                # Re-parse the repaired text with the C engine instead of splitting every row in python
+                chunk = pd.read_csv(io.StringIO(f"{packed_header}\n{packed_rows}"), sep=",", engine="c")
+
+                if chunk_number == 0:
+                    logger.info(f"Corrected columns after normalization: {chunk.columns.tolist()}")
+
+            # Schema validation (production mindset)
+            # Cross Validating expected columns with columns that got fetched from file
+            missing_columns = EXPECTED_COLUMNS.difference(chunk.columns)
+
+            if missing_columns:
+                logger.error(f"CSV Schema mismatched error")
+                logger.error(f"Expected columns: {sorted(EXPECTED_COLUMNS)}")
+                logger.error(f"Actual columns: {list(chunk.columns)}")
+
+                raise ValueError(f"Missing columns: {sorted(missing_columns)}")
+
+            total_rows += len(chunk)
+
+            # order_date is converted once here, the watermark filter and transform_data() both reuse it.
+            # Invalid dates become NaT (errors="coerce").
+            chunk["order_date"] = pd.to_datetime(chunk["order_date"], errors="coerce")
+
+            # -------------------------
+            # INCREMENTAL FILTER (pushed down into the read)
+            # -------------------------
+
+            if last_watermark is not None:
+                order_dates = chunk["order_date"].to_numpy()
+
+                # NaT never compares greater than the watermark, rows with invalid dates are kept explicitly so the
+                # data quality null check rejects the run instead of the rows silently disappearing here.
+                # Consequence: every later run fails as well until the row is fixed in the source file.
+                invalid_dates = np.isnat(order_dates)
+                invalid_date_count += int(invalid_dates.sum())
+
+                keep_rows = (order_dates > watermark_datetime64) | invalid_dates
+                chunk = chunk.iloc[np.flatnonzero(keep_rows)]                 # VERY IMPORTANT POINT BELOW
+                """ Above line means:
+                # “Give me only those rows whose order_date is greater than the last order_date that already exists in
+                # the database.” And it will compare all order dates in the incoming dataframe and filter the data
+                # according to dates only
+                Why We NEVER Compute MAX from Incoming Data
+                    If you do: 
+                        df["order_date"].max()
+                    🚨 That is WRONG for incremental loads because:
+                        1. CSV might contain old data and new data as well.
+                        2. File might be reprocessed
+                        3. Late-arriving data exists
+                        4. You lose idempotency
+                    📌 Production rule:    
+                    Incremental watermark must come from the TARGET, not the SOURCE.
+                """
+
+            chunks.append(chunk)
+
+        # A single chunk (the usual case for small files) is returned as-is, without a concat copy
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+        if last_watermark is not None:
+            logger.info(
+                f"Incremental filter applied | "
+                f"Before: {total_rows}, After: {len(df)}"
+            )
 
-            raise ValueError(f"Expected columns {expected_columns}, but got {actual_columns}")
+            if invalid_date_count:
+                logger.warning(f"Kept {invalid_date_count} rows with invalid order_date for the data quality checks")
 
         # =========================
         # SUCCESS LOGGING
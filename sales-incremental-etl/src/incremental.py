@@ -1,7 +1,14 @@
 # 5th File
 
 from sqlalchemy import text
-from utils import load_config
+
+# Small metadata table holding one row per target table with its last loaded order_date.
+# Looking the watermark up by primary key avoids scanning the whole fact table for MAX(order_date).
+WATERMARK_TABLE = "etl_watermarks"
+
+# Last loaded order_date per (schema, table), so repeated runs in one process skip the lookup round trip.
+# Kept up to date by load_to_postgres after every successful merge.
+_WATERMARK_CACHE = {}
 
 
 def get_last_watermark(engine, schema, table, logger):
@@ -31,6 +38,10 @@ def get_last_watermark(engine, schema, table, logger):
     Incase no value is passed when calling function it will return an error.
 
     This function, get last_load_date or max of order date for incremental data load into PostgreSQL.
+    The value is read from the etl_watermarks metadata table. Only when the target table has no entry there yet
+    (first run) it falls back to MAX(order_date) of the target table.
+    The lookup is read-only: the metadata table is created by load_to_postgres (see create_watermark_table()) and
+    the watermark is recorded by its merge transaction (see save_watermark()).
 
     :param engine:
     :param schema:
@@ -39,15 +50,98 @@ def get_last_watermark(engine, schema, table, logger):
     :return:
     """
 
-    try:
-        query = text(f"SELECT MAX(order_date) FROM {schema}.{table}")
+    if (schema, table) in _WATERMARK_CACHE:
+        result = _WATERMARK_CACHE[(schema, table)]
+        logger.info(f"Last watermark/incremental value served from cache: {result}")
+        return result
 
+    try:
         with engine.connect() as conn:
-            result = conn.execute(query).scalar()
+            # to_regclass() is a catalog lookup, NULL instead of an error when the table does not exist yet
+            table_exists = conn.execute(
+                text("SELECT to_regclass(:watermark_table) IS NOT NULL"),
+                {"watermark_table": f"{schema}.{WATERMARK_TABLE}"}
+            ).scalar()
 
+            result = None
+            if table_exists:
+                result = conn.execute(
+                    text(f"SELECT last_order_date FROM {schema}.{WATERMARK_TABLE} WHERE table_name = :table_name"),
+                    {"table_name": table}
+                ).scalar()
+
+            if result is None:
+                logger.info(f"No watermark recorded for {schema}.{table}, falling back to MAX(order_date)")
+                result = conn.execute(text(f"SELECT MAX(order_date) FROM {schema}.{table}")).scalar()
+
+        _WATERMARK_CACHE[(schema, table)] = result
         logger.info(f"Last watermark/incremental value fetched: {result}")
         return result
 
     except Exception:
         logger.exception("Failed to fetch watermark value from postgre orders table.")
         raise
+
+
+def create_watermark_table(conn, schema):
+    """
+    Create the etl_watermarks metadata table if it does not exist yet. One-time setup, called by load_to_postgres
+    together with the staging table DDL, so the watermark lookup itself stays read-only.
+
+    :param conn:
+    :param schema:
+    :return:
+    """
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {schema}.{WATERMARK_TABLE} ("
+        f"table_name TEXT PRIMARY KEY, last_order_date TIMESTAMP NOT NULL)"
+    ))
+
+
+def save_watermark(conn, schema, table, watermark):
+    """
+    Record "watermark" for the target table in the etl_watermarks metadata table.
+
+    Call it with the connection of the transaction that merges the data, so the watermark and the merged rows are
+    committed together. The stored value never moves backwards.
+
+    :param conn:
+    :param schema:
+    :param table:
+    :param watermark:
+    :return:
+    """
+    upsert_sql = f"""
+        INSERT INTO {schema}.{WATERMARK_TABLE} (table_name, last_order_date)
+        VALUES (:table_name, :last_order_date)
+        ON CONFLICT (table_name)
+        DO UPDATE SET last_order_date = GREATEST({schema}.{WATERMARK_TABLE}.last_order_date, EXCLUDED.last_order_date);
+        """
+
+    conn.execute(text(upsert_sql), {"table_name": table, "last_order_date": watermark})
+
+
+def update_cached_watermark(schema, table, watermark):
+    """
+    Advance the cached watermark after rows up to "watermark" were merged into the target table.
+
+    :param schema:
+    :param table:
+    :param watermark:
+    :return:
+    """
+    cached = _WATERMARK_CACHE.get((schema, table))
+    if cached is not None and cached >= watermark:
+        return
+    _WATERMARK_CACHE[(schema, table)] = watermark
+
+
+def invalidate_watermark(schema, table):
+    """
+    Drop the cached watermark so the next lookup reads it from PostgreSQL again.
+
+    :param schema:
+    :param table:
+    :return:
+    """
+    _WATERMARK_CACHE.pop((schema, table), None)
@@ -4,15 +4,98 @@
 # =========================
 
 
+import io
+from datetime import datetime
+from functools import lru_cache
 import pandas as pd
+import psycopg2
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
-from utils import load_config
+from utils import get_config
 from urllib.parse import quote_plus
-from incremental import get_last_watermark
+from incremental import (
+    create_watermark_table, get_last_watermark, save_watermark, update_cached_watermark, invalidate_watermark
+)
+from checkpoints import check_staging_quality
 
+# Columns bulk copied into the staging table, in the order they are written to the COPY stream
+LOAD_COLUMNS = ["order_id", "order_date", "customer_id", "product", "quantity", "price", "revenue"]
 
-def load_to_postgres(df: pd.DataFrame, logger):
+
+@lru_cache(maxsize=8)
+def _get_engine(connection_url: str):
+    """
+    Build the SQLAlchemy engine once per connection url and reuse it (and its connection pool) for later loads.
+
+    :param connection_url:
+    :return:
+    """
+    return create_engine(connection_url, pool_pre_ping=True, pool_size=4)
+
+
+def _copy_buffer(df: pd.DataFrame) -> io.StringIO:
+    """
+    Serialize "df" as the CSV stream read by COPY: LOAD_COLUMNS in that order, no header and no index.
+    Empty CSV fields (NaN / NaT / None) are read back as NULL by COPY.
+
+    :param df: Transformed sales data
+    :return: io.StringIO: CSV text, positioned at the start
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, columns=LOAD_COLUMNS, index=False, header=False)
+    buffer.seek(0)
+    return buffer
+
+
+def get_engine(pg_config: dict, logger):
+    """
+    Build (or reuse) the SQLAlchemy engine for the "postgres" section of config.yaml and test the connection.
+
+    :param pg_config: "postgres" section of config.yaml
+    :param logger: logging in-case of errors or success
+    :return: sqlalchemy.engine.Engine
+    """
+    host = pg_config["host"]
+    port = pg_config["port"]
+    database = pg_config["database"]
+    user = pg_config["user"]
+    password = pg_config["password"]                    # 👈 PASSWORD READ HERE
+
+    # ----------------------------------------------------------------------
+    # URL-ENCODE PASSWORD IF IT INVOLVES SPECIAL CHARACTERS (CRITICAL FIX)
+    # ----------------------------------------------------------------------
+
+    encoded_password = quote_plus(password)
+
+    logger.info(
+        f"Postgres Config Loaded | host={pg_config['host']} | port={pg_config['port']} | "
+        f"db={pg_config['database']} | user={pg_config['user']}"
+    )
+
+    # =========================
+    # BUILD CONNECTION STRING
+    # =========================
+
+    try:
+        connection_url = (
+            f"postgresql+psycopg2://{user}:{encoded_password}"
+            f"@{host}:{port}/{database}"
+        )
+
+        engine = _get_engine(connection_url)
+
+        # Test connection explicitly
+        with engine.connect() as conn:
+            logger.info("PostgreSQL connection established successfully")
+
+    except Exception:
+        logger.exception("Failed to establish PostgreSQL connection")
+        raise
+
+    return engine
+
+
+def load_to_postgres(df: pd.DataFrame, logger, engine=None):
     """
     The below green part is known as DocString of a function, which provides the clarity for the purpose & usage of it.
     If there is anything written after a sign "->" is known as return annotation or a return type hint of a function.
@@ -48,6 +131,7 @@ def load_to_postgres(df: pd.DataFrame, logger):
     Args:
         df (pd.DataFrame): Transformed sales data
         logger (logging.Logger): Application logger
+        engine (sqlalchemy.engine.Engine): Engine of the run (see get_engine()), built from the config when not given
 
     """
     logger.info("Starting PostgreSQL load step")
@@ -56,50 +140,19 @@ def load_to_postgres(df: pd.DataFrame, logger):
     # LOAD CONFIGURATIONS
     # =========================
 
-    config = load_config()
+    config = get_config()
     pg_config = config["postgres"]
 
-    host = pg_config["host"]
-    port = pg_config["port"]
-    database = pg_config["database"]
-    user = pg_config["user"]
-    password = pg_config["password"]                    # 👈 PASSWORD READ HERE
     schema = pg_config["schema"]
     table = pg_config["table"]
 
-    # ----------------------------------------------------------------------
-    # URL-ENCODE PASSWORD IF IT INVOLVES SPECIAL CHARACTERS (CRITICAL FIX)
-    # ----------------------------------------------------------------------
-
-    encoded_password = quote_plus(password)
-
-    logger.info(
-        f"Postgres Config Loaded | host={pg_config['host']} | port={pg_config['port']} | "
-        f"db={pg_config['database']} | user={pg_config['user']}"
-    )
-
-    # =========================
-    # BUILD CONNECTION STRING
-    # =========================
-
-    try:
-        connection_url = (
-            f"postgresql+psycopg2://{user}:{encoded_password}"
-            f"@{host}:{port}/{database}"
-        )
-
-        engine = create_engine(connection_url)
-
-        # Test connection explicitly
-        with engine.connect() as conn:
-            logger.info("PostgreSQL connection established successfully")
-
-    except Exception:
-        logger.exception("Failed to establish PostgreSQL connection")
-        raise
+    # main() already built (and tested) the engine of this run, only build it when called on its own
+    if engine is None:
+        engine = get_engine(pg_config, logger)
 
     # =========================
-    # LOAD DATA based on last-watermark is not null
+    # LOAD DATA
+    # The incremental (watermark) filter is already applied while extracting, see extract_data()
     # =========================
 
     try:
@@ -107,73 +160,50 @@ def load_to_postgres(df: pd.DataFrame, logger):
             logger.error("Empty DataFrame received for PostgreSQL load")
             raise ValueError("Cannot load empty DataFrame")
 
-        # -------------------------
-        # INCREMENTAL LOAD LOGIC
-        # -------------------------
+        # Implementing staging table -
+        staging_table = f"{table}_staging"
 
-        last_watermark = get_last_watermark(
-            engine=engine,
-            schema=schema,
-            table=table,
-            logger=logger
+        # Staging table is created once with the target's definition and only truncated on later runs, instead of
+        # being dropped and re-created every load (to_sql if_exists="replace" did that).
+        # The watermark metadata table is set up here as well, the merge below records the new watermark in it.
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {schema}.{staging_table} "
+                f"(LIKE {schema}.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            create_watermark_table(conn, schema)
+            conn.execute(text(f"TRUNCATE {schema}.{staging_table}"))
+
+        # Bulk load through PostgreSQL COPY instead of to_sql(method="multi"), which sends batched INSERT statements.
+        # COPY is not exposed by SQLAlchemy, so we go through the underlying psycopg2 connection.
+        copy_sql = (
+            f"COPY {schema}.{staging_table} ({', '.join(LOAD_COLUMNS)}) "
+            f"FROM STDIN WITH (FORMAT CSV)"
         )
 
-        # -------------------------
-        # TYPE NORMALIZATION (CRITICAL)
-        # Because we were seeing an error earlier when comparing the data from pandas "df" dataset order date
-        # with sql max of order date
-        # -------------------------
+        raw_conn = engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            cursor.copy_expert(copy_sql, _copy_buffer(df))
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
 
-        if last_watermark is not None:
-            last_watermark = pd.to_datetime(last_watermark)
-            logger.info(
-                f"Watermark/Incremental value normalized to pandas Timestamp: {last_watermark}"
-            )
-
-        if last_watermark:
-            original_count = len(df)
-            df = df[df["order_date"] > last_watermark]                  # VERY IMPORTANT POINT BELOW
-            """ Above line means:
-            # “Give me only those rows whose order_date is greater than the last order_date that already exists in the
-            # database.” And it will compare all order dates in the incoming dataframe and filter the data
-            # according to dates only
-            Why We NEVER Compute MAX from Incoming Data
-                If you do: 
-                    df["order_date"].max()
-                🚨 That is WRONG for incremental loads because:
-                    1. CSV might contain old data and new data as well.
-                    2. File might be reprocessed
-                    3. Late-arriving data exists
-                    4. You lose idempotency
-                📌 Production rule:    
-                Incremental watermark must come from the TARGET, not the SOURCE.
-            """
-            logger.info(
-                f"Incremental filter applied | "
-                f"Before: {original_count}, After: {len(df)}"
-            )
-
-        if df.empty:
-            logger.info("No new records to load. Skipping write.")
-            return
-
-        # TILL HERE, If you do not want to run incremental comment the above code between incremental to this.
+        logger.info("Data loaded to staging table")
 
-        # Implementing staging table -
-        staging_table = f"{table}_staging"
+        # Fresh statistics on the just-loaded staging table, so the planner has accurate row counts for the
+        # data quality query and the merge
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE {schema}.{staging_table}"))
 
-        df.to_sql(
-            name=staging_table,                     # replaced from "table" to "staging_table"
-            con=engine,
+        # Data quality gate runs in the database, nothing reaches the target table unless it passes
+        check_staging_quality(
+            engine=engine,
             schema=schema,
-            if_exists="replace",      # Changed to "replace" from "append" & # later change this for incremental load
-            index=False,
-            method="multi",
-            chunksize=500
+            staging_table=staging_table,
+            logger=logger
         )
 
-        logger.info("Data loaded to staging table")
-
         merge_sql = f"""
             INSERT INTO {schema}.{table} (
                 order_id, order_date, customer_id, product,
@@ -181,7 +211,9 @@ def load_to_postgres(df: pd.DataFrame, logger):
             )
             SELECT  order_id, order_date, customer_id, product,
             quantity, price, revenue, current_timestamp as created_date, 'system' as created_by
-            FROM {schema}.{staging_table} ON CONFLICT ON CONSTRAINT sales_orders_pkey
+            FROM {schema}.{staging_table}
+            WHERE order_date > :last_watermark
+            ON CONFLICT ON CONSTRAINT sales_orders_pkey
             DO UPDATE SET 
                 order_date = EXCLUDED.order_date,
                 customer_id = EXCLUDED.customer_id,
@@ -193,19 +225,40 @@ def load_to_postgres(df: pd.DataFrame, logger):
                 modified_by = 'system';
             """
 
+        # Only rows newer than the current watermark are merged (already cached, no extra round trip).
+        # First load has no watermark, then every row qualifies.
+        last_watermark = get_last_watermark(
+            engine=engine,
+            schema=schema,
+            table=table,
+            logger=logger
+        )
+        if last_watermark is None:
+            last_watermark = datetime.min
+
+        # Newest order_date in this batch, committed together with the merged rows
+        new_watermark = df["order_date"].max().to_pydatetime()
+
         with engine.begin() as conn:
-            conn.execute(text(merge_sql))               # This text function is a part of sqlalchemy
+            conn.execute(
+                text(merge_sql),                        # This text function is a part of sqlalchemy
+                {"last_watermark": last_watermark}
+            )
+            save_watermark(conn, schema, table, new_watermark)
+
+            # Leave the staging table empty for the next run, no DROP
+            conn.execute(text(f"TRUNCATE {schema}.{staging_table}"))
 
         logger.info(
             f"Loaded {len(df)} records into "
             f"{schema}.{table}"
         )
 
-        # drop_sql = f"DROP TABLE IF EXISTS {schema}.{staging_table};"
-        #
-        # with engine.begin() as conn:
-        #     conn.execute(text(drop_sql))
+        # Target now holds everything up to the newest loaded order_date
+        update_cached_watermark(schema, table, new_watermark)
 
-    except SQLAlchemyError:
+    except (SQLAlchemyError, psycopg2.Error):
+        # Unknown what reached the target, re-read the watermark from PostgreSQL next time
+        invalidate_watermark(schema, table)
         logger.exception("PostgreSQL load failed")
         raise
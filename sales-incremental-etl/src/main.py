@@ -1,27 +1,49 @@
 # 7th File calling all modules in 1 place
 
-from utils import load_config, setup_logging
+from utils import exit_on_sigterm, load_config, set_config, setup_logging
 from extract import extract_data
 from transform import transform_data
-from checkpoints import check_nulls, check_ranges, check_duplicates
-from load_postgres import load_to_postgres
-# Incremental logic is a part of load_postgres module, therefore we haven't imported the same in main module
+from load_postgres import get_engine, load_to_postgres
+from incremental import get_last_watermark
+# Watermark is fetched up front so extract_data can drop already loaded rows while reading the file
+# Data quality checks run on the staging table inside load_postgres module, therefore not imported here
 
 
 def main():
+    # Process level setup: SIGTERM (e.g. a scheduler stopping the run) exits through SystemExit, so the atexit hooks
+    # still flush the buffered log records
+    exit_on_sigterm()
+
+    # Parse the config once and share it with every module of the run
     config = load_config()
+    set_config(config)
+
     logger = setup_logging(
         config["log_file_path"],
-        config["logging"]["level"]
+        config["logging"]["level"],
+        max_bytes=config["logging"].get("max_bytes", 0),
+        backup_count=config["logging"].get("backup_count", 0)
     )
 
     try:
-        df_raw = extract_data(config, logger)
+        pg_config = config["postgres"]
+        engine = get_engine(pg_config, logger)
+
+        last_watermark = get_last_watermark(
+            engine=engine,
+            schema=pg_config["schema"],
+            table=pg_config["table"],
+            logger=logger
+        )
+
+        df_raw = extract_data(config, logger, last_watermark=last_watermark)
+
+        if df_raw.empty:
+            logger.info("No new records to load. Skipping run.")
+            return
+
         df_clean = transform_data(df_raw, logger)
-        df_data_quality_null_checks = check_nulls(df_clean, df_clean.columns, logger)
-        df_data_quality_range_checks = check_ranges(df_clean, logger)
-        df_data_quality_duplicate_checks = check_duplicates(df_clean, logger)
-        load_to_postgres(df_clean, logger)
+        load_to_postgres(df_clean, logger, engine=engine)
         # data_engineering_learning_projects_salesdb
 
         logger.info("Project 2 – PostgreSQL ETL completed successfully")
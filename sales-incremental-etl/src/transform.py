@@ -13,6 +13,9 @@ Issue	                            Fix
 # IMPORTS
 # =========================
 
+import numpy as np
+# numpy is the third-party array library pandas is built on, used here for the revenue multiply
+
 import pandas as pd
 # pandas is a third-party library used for data manipulation
 
@@ -85,37 +88,28 @@ def transform_data(df: pd.DataFrame, logger) -> pd.DataFrame:
         raise ValueError("Cannot transform empty dataframe.")
 
     # =========================
-    # HANDLE MISSING VALUES
-    # =========================
-
-    # Fill missing quantity values with 1
-    # pandas.Series.fillna() fills missing values
-    df["quantity"] = df["quantity"].fillna(1)
-
-    logger.info("Missing value in 'quantity' filled with 1")
-
-    # =========================
-    # DATA TYPE CONVERSIONS
+    # HANDLE MISSING VALUES & DATA TYPE CONVERSIONS
     # =========================
 
-    # Convert quantity column to integer
-    # pandas.to_numeric() converts values to numeric type
-    df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce")
+    # One pass per column: pandas.to_numeric() converts to numeric (invalid values become NaN because of
+    # errors="coerce"), fillna() then handles both missing and invalid values in the same step, and the final
+    # astype() downcasts without another intermediate Series.
 
-    # Handle missing or invalid quantity AFTER conversion, since it can create conversion issues
-    df["quantity"] =  df["quantity"].fillna(1)
+    # Missing or invalid quantity is replaced with 1, int32 is plenty for order line quantities
+    df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(1).astype("int32")
 
-    # Now safe to convert to int
-    df["quantity"] = df["quantity"].astype(int)
+    logger.info("Missing value in 'quantity' filled with 1")
 
-    # Convert price column to float and fill na after conversion since it can create conversion issues
-    df["price"] = pd.to_numeric(df["quantity"], errors="coerce")
-    df["price"] = df["price"].fillna(0.0)
+    # Missing or invalid price is replaced with 0.0
+    # Kept float64: prices are loaded into NUMERIC columns and float32 (~7 significant digits) changes the cents
+    df["price"] = pd.to_numeric(df["price"], errors="coerce").fillna(0.0).astype("float64")
 
     # Convert order_date column to datetime
-    # pandas.to_datetime() converts string to datetime
-    df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
-    df["order_date"] = df["order_date"].fillna(9999-99-99)
+    # pandas.to_datetime() converts string to datetime, invalid dates become NaT and are rejected by the
+    # data quality null check before anything is merged. extract_data() already converts it, so it is only parsed
+    # here for frames coming from elsewhere.
+    if not pd.api.types.is_datetime64_any_dtype(df["order_date"]):
+        df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
 
     logger.info("Data type conversion completed.")
 
@@ -127,29 +121,33 @@ def transform_data(df: pd.DataFrame, logger) -> pd.DataFrame:
     # Keeping the first occurrence of duplicate order_id
     initial_row_count = df.shape[0]                               # getting row count using shape method of pandas
 
-    # df = df.drop_duplicates(subset=["order_id"], keep="first")
-    df = df.drop_duplicates(subset="order_id", keep="first").copy()
+    # Series.is_unique is a single hash pass, on the common no-duplicate path the frame is kept as-is instead of
+    # being copied column by column. reset_index() hands back a fresh frame (no SettingWithCopyWarning on the
+    # assignments below) and is cheaper than the .copy() we used before.
+    if not df["order_id"].is_unique:
+        df = df.drop_duplicates(subset="order_id", keep="first").reset_index(drop=True)
     removed_rows = initial_row_count - df.shape[0]
 
     logger.info(f" Removed {removed_rows} duplicate rows based on order_id 4.")
 
+    # Few distinct products, so store them as category codes instead of one python string per row
+    df["product"] = df["product"].astype("category")
+
     # =========================
     # BUSINESS LOGIC
     # =========================
 
     # Create revenue column
-    # Vectorized operation in pandas (fast & efficient)
-    df["revenue"] = df["quantity"] * df["price"]
+    # Vectorized numpy multiply written straight into a preallocated float64 array (int32 * float64 is computed in
+    # float64 anyway). Not float32: revenue is money and float32 rounding changes the cents.
+    revenue = np.empty(len(df), dtype="float64")
+    np.multiply(df["quantity"].to_numpy(), df["price"].to_numpy(), out=revenue)
+    df["revenue"] = revenue
 
     logger.info("Revenue column created.")
 
-    # =========================
-    # FINAL VALIDATION
-    # =========================
-
-    # Ensure no negative revenue
-    if (df["revenue"] < 0).any():
-        logger.warning("Negative revenue values found.")
+    # No separate negative revenue scan: the data quality range check rejects quantity <= 0 and price <= 0
+    # before anything is merged, so a negative revenue can never reach the target table.
 
     logger.info("Data transformation completed successfully.")
 
@@ -1,13 +1,85 @@
 # 1st File
 
-import logging, yaml, os
+import logging, logging.handlers, os, json, atexit, signal, queue, threading, mmap, re
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 
 """
 If your python version doesn't have the above mentioned libraries, then install it first 
 it in your existing version so that it can create virtual environment for the same as well for running the package
 """
 
+# yaml (PyYAML) is imported on the first YAML parse, not at import time, see _get_yaml_loader().
+# Callers that never parse YAML (config served from cache / JSON copy, logging only) don't pay for importing it.
+_YAML_LOADER = None
+
+# Resolved once at import, the location of this file cannot change while the process runs
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Same as a plain string, used by load_config() and setup_logging() to build file paths with os.path.join instead of
+# allocating intermediate Path objects
+_PROJECT_ROOT_STR = str(_PROJECT_ROOT)
+
+# Number of log records buffered in memory before they are written to the log file
+LOG_BUFFER_CAPACITY = 1024
+
+# Config of the current run, registered once by the entry point with set_config() and read by the pipeline modules
+# through get_config(), so the config file is looked up a single time per run
+_CONFIG_SINGLETON = None
+
+# Accepted values for logging.level in config.yaml
+_LEVELS = {
+    "CRITICAL": logging.CRITICAL,
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+    "NOTSET": logging.NOTSET,
+}
+
+# Root logger once setup_logging() has configured it, guarded by _LOGGER_LOCK for the first call
+_LOGGER = None
+_LOGGER_LOCK = threading.Lock()
+
+# Size of the write buffer of the log file (>= filesystem block size, so writes are amortized into few syscalls)
+LOG_FILE_BUFFER_BYTES = 64 * 1024
+
+# Flags of the log file descriptor: every write() lands at the current end of file, also when several ETL processes
+# append to the same log, and the fd is not inherited by child processes
+LOG_FILE_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_CLOEXEC", 0)
+
+# Suffix of the JSON copy written next to a parsed YAML config (config.yaml -> config.yaml.cache.json).
+# json.load is much cheaper than parsing YAML, so new processes read this file while it was written for the current
+# YAML file: the copy stores the (st_mtime_ns, st_size, st_ino) of the YAML it was parsed from.
+CONFIG_SIDECAR_SUFFIX = ".cache.json"
+
+# Config files larger than this are memory-mapped for parsing instead of read through a file buffer,
+# below one mapping's setup cost is higher than the copy it saves
+CONFIG_MMAP_THRESHOLD_BYTES = 64 * 1024
+
+# First line a config file must start with to be read by load_config_fast() without YAML
+FAST_PARSE_MARKER = "# fast-parse: ok"
+
+# "key: value" line of a flat config file, see _parse_flat_config()
+_FLAT_CONFIG_LINE = re.compile(r"([A-Za-z_][\w.-]*):\s*(.*)")
+_FLAT_CONFIG_INT = re.compile(r"[-+]?(0|[1-9][0-9]*)")
+_FLAT_CONFIG_FLOAT = re.compile(r"[-+]?(0|[1-9][0-9]*)\.[0-9]+([eE][-+][0-9]+)?")
+_FLAT_CONFIG_STRING = re.compile(r"[A-Za-z_/][\w./-]*")
+
+# Plain words YAML 1.1 reads as booleans, never treated as strings by the fast parser
+_YAML_BOOL_WORDS = frozenset({"y", "n", "yes", "no", "on", "off"})
+
+# Returned by _parse_flat_scalar() for values that need the YAML parser
+_NOT_FLAT = object()
+
+# Parsed config files: {full_config_path: (st_mtime_ns, config)}
+# A file is only parsed again when its modification time changes.
+_CONFIG_CACHE = {}
+
+# Results of load_config_keys(): {(full_config_path, st_mtime_ns, dotted_paths): {dotted_path: value}}
+_CONFIG_KEYS_CACHE = {}
+
 
 def get_project_root() -> Path:
     """
@@ -34,19 +106,59 @@ def get_project_root() -> Path:
 
     Get project root directory.
     Assumes this file is located at: project_root/src/utils.py
+    The path is resolved once when the module is imported, so calling this is free (no filesystem calls).
 
     :return: Path
     """
 
-    return Path(__file__).resolve().parent.parent
+    return _PROJECT_ROOT
+
+
+def _get_yaml_loader():
+    """
+    Import PyYAML on first use and return its safe loader class, cached for later calls.
 
+    Prefer the libyaml C loader, it parses the same YAML as SafeLoader but much faster.
+    PyYAML builds without libyaml only ship the pure python SafeLoader.
 
-def load_config(config_path: str = "config/config.yaml") -> dict:
+    :return: yaml.CSafeLoader or yaml.SafeLoader
+    """
+    global _YAML_LOADER
+
+    if _YAML_LOADER is None:
+        try:
+            from yaml import CSafeLoader as loader
+        except ImportError:
+            from yaml import SafeLoader as loader
+            logging.getLogger(__name__).warning(
+                "PyYAML C extension (libyaml) not available, falling back to the pure python SafeLoader. "
+                "Install libyaml-dev and reinstall PyYAML for faster config parsing."
+            )
+        _YAML_LOADER = loader
+
+    return _YAML_LOADER
+
+
+def _parse_yaml(stream):
+    """
+    Parse a single YAML document with the cached safe loader, same as yaml.load(stream, Loader=...).
+
+    :param stream: Open file or string with YAML content.
+    :return: Parsed document.
+    """
+    loader = _get_yaml_loader()(stream)
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
+
+
+def load_config(config_path: str = "config/config.yaml") -> Mapping:
     """
     The below green part is known as DocString of a function, which provides the clarity for the purpose & usage of it.
-    "dict" after a sign "->" is known as  return annotation or a return type hint of a function. (Shared below).
+    "Mapping" after a sign "->" is known as  return annotation or a return type hint of a function. (Shared below).
 
-    About return type hint: -> a return type hint (e.g., -> pd.DataFrame AND -> dict) is a piece of metadata in a
+    About return type hint: -> a return type hint (e.g., -> pd.DataFrame AND -> Mapping) is a piece of metadata in a
         function's signature that specifies what type of value the function is expected to return.
 
         Though, Python is a dynamically typed language, so return hints are not enforced at runtime. If you declare a
@@ -68,25 +180,574 @@ def load_config(config_path: str = "config/config.yaml") -> dict:
 
     Incase no value is passed when calling function it will return the default value from YAML config file.
 
+    The parsed config is cached per file and modification time, so the YAML file is only parsed again after it
+    changed on disk and every caller gets the same object back. It is frozen (read-only mappings and tuples, see
+    _freeze()), so callers can share it without copying and cannot change it for each other.
+
     :param config_path:
         config_path (str): Path to config file default value.
 
     :return:
-        dict: Configuration dictionary.
+        Mapping: Configuration as a read-only MappingProxyType (lists become tuples). Use dict() / a deep copy before
+        changing it or passing it to json.dump().
     """
 
-    project_root = get_project_root()
-    full_config_path = project_root / config_path
+    full_config_path = os.path.join(_PROJECT_ROOT_STR, config_path)
 
     try:
-        with open(full_config_path, "r") as file:
-            config = yaml.safe_load(file)
-            return config
+        # One stat() call decides whether the cached config is still current
+        config_stat = os.stat(full_config_path)
+        mtime_ns = config_stat.st_mtime_ns
+
+        cached = _CONFIG_CACHE.get(full_config_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        sidecar_path = full_config_path + CONFIG_SIDECAR_SUFFIX
+        source = _config_source(config_stat)
+        config = _read_config_sidecar(sidecar_path, source)
+
+        if config is None:
+            with _open_noatime(full_config_path) as file:
+                if config_stat.st_size > CONFIG_MMAP_THRESHOLD_BYTES:
+                    # Parse straight from the page cache, pages are loaded on demand
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        config = _parse_yaml(mapped)
+                else:
+                    config = _parse_yaml(file)
+            _write_config_sidecar(sidecar_path, config, source, config_stat.st_mode & 0o777)
+
+        config = _freeze(config)
+        _CONFIG_CACHE[full_config_path] = (mtime_ns, config)
+        return config
+    except FileNotFoundError as exc:
+        # Keep the original errno/filename, but not the duplicate traceback of the OS level error
+        raise FileNotFoundError(
+            exc.errno, f"Configuration file not found at {full_config_path}", full_config_path
+        ) from None
+
+
+def _freeze(value):
+    """
+    Read-only copy of a parsed config: dicts become MappingProxyType views, lists become tuples.
+
+    Done once per parse, readers then share the same object without any deepcopy.
+
+    :param value: Parsed YAML/JSON value.
+    :return: Frozen value.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _open_noatime(path: str):
+    """
+    Open "path" for reading without updating its access time (O_NOATIME, Linux only), saves a metadata write on
+    every read of the file.
+
+    :param path: File to open.
+    :return: Text file object
+    """
+    flags = os.O_RDONLY | getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(path, flags)
+    except PermissionError:
+        # O_NOATIME is only allowed for the owner of the file, retry without it
+        fd = os.open(path, os.O_RDONLY)
+    return os.fdopen(fd, "r")
+
+
+def set_config(config: Mapping) -> None:
+    """
+    Register the config of the current run, returned by every later get_config() call.
+
+    :param config: Parsed configuration, usually the read-only mapping returned by load_config().
+    :return: None
+    """
+    global _CONFIG_SINGLETON
+    _CONFIG_SINGLETON = config
+
+
+def get_config() -> Mapping:
+    """
+    Config of the current run, as registered with set_config(). Falls back to (and registers) load_config() with
+    the default config file when nothing was registered, e.g. when a module is used on its own.
+
+    :return: Mapping: Configuration (read-only), see load_config().
+    """
+    global _CONFIG_SINGLETON
+    if _CONFIG_SINGLETON is None:
+        _CONFIG_SINGLETON = load_config()
+    return _CONFIG_SINGLETON
+
+
+def _config_source(config_stat: os.stat_result) -> list:
+    """
+    Identity of a YAML file version, stored in its JSON copy. Comparing only modification times would keep serving
+    a stale copy after an older config is restored with its original mtime (cp -p, rsync -t, tar); size and inode
+    change in those cases.
+
+    :param config_stat: os.stat() of the YAML file.
+    :return: list: [st_mtime_ns, st_size, st_ino] (a list, as read back from JSON)
+    """
+    return [config_stat.st_mtime_ns, config_stat.st_size, config_stat.st_ino]
+
+
+def _read_config_sidecar(sidecar_path: str, source: list):
+    """
+    Read the JSON copy of a config file if it was written for this version of the YAML file.
+
+    :param sidecar_path: Path to the JSON copy.
+    :param source: _config_source() of the YAML file.
+    :return: dict or None when there is no usable JSON copy.
+    """
+    try:
+        with open(sidecar_path, "r") as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        # Missing, unreadable or half written copy, parse the YAML instead
+        return None
+
+    if not isinstance(cached, dict) or cached.get("source") != source:
+        return None
+    return cached.get("config")
+
+
+def _write_config_sidecar(sidecar_path: str, config, source: list, mode: int = 0o600) -> None:
+    """
+    Write the JSON copy of a parsed config file next to it. Best effort, failures only mean the next process parses
+    the YAML again.
+
+    The copy is written to a temporary file and moved into place with os.replace(), so readers never see a partly
+    written file. It is created with the permission bits of the YAML file (further reduced by the umask), the config
+    holds the database password and the copy must not be readable by more users than the original.
+
+    :param sidecar_path: Path to the JSON copy.
+    :param config: Parsed config.
+    :param source: _config_source() of the YAML file the config was parsed from.
+    :param mode: Permission bits of the YAML file.
+    :return: None
+    """
+    # Only dicts that survive a JSON round trip unchanged (no dates, no non-string keys) can be served from JSON
+    try:
+        serialized = json.dumps({"source": source, "config": config})
+        if not isinstance(config, dict) or json.loads(serialized)["config"] != config:
+            return
+    except (TypeError, ValueError):
+        return
+
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        with os.fdopen(fd, "w") as file:
+            file.write(serialized)
+        os.replace(tmp_path, sidecar_path)
+    except OSError:
+        logging.getLogger(__name__).debug(f"Could not write config cache file {sidecar_path}", exc_info=True)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_config_fast(config_path: str = "config/config.yaml") -> Mapping:
+    """
+    Same result as load_config(), but files starting with the line "# fast-parse: ok" that only hold top level
+    "key: scalar" lines are read with a small line parser instead of YAML.
+
+    Any file without the marker, and any line the line parser is not sure about (nesting, lists, flow collections,
+    block scalars, anchors, tags, quotes with escapes, YAML 1.1 booleans, dates ...), goes through load_config().
+    Results share load_config()'s cache.
+
+    :param config_path: Path to config file relative to the project root.
+    :return: Mapping: Configuration (read-only), see load_config().
+    """
+    full_config_path = os.path.join(_PROJECT_ROOT_STR, config_path)
+
+    try:
+        mtime_ns = os.stat(full_config_path).st_mtime_ns
+
+        cached = _CONFIG_CACHE.get(full_config_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with _open_noatime(full_config_path) as file:
+            content = file.read()
     except FileNotFoundError:
-        raise FileNotFoundError(f"Configuration file not found at {full_config_path}")
+        # load_config() raises the usual "Configuration file not found" error
+        return load_config(config_path)
+
+    if content.startswith(FAST_PARSE_MARKER):
+        config = _parse_flat_config(content)
+        if config is not None:
+            config = _freeze(config)
+            _CONFIG_CACHE[full_config_path] = (mtime_ns, config)
+            return config
+
+    return load_config(config_path)
+
+
+def _parse_flat_config(content: str):
+    """
+    Parse a config made only of top level "key: scalar" lines, the way YAML would.
+
+    :param content: Text of the config file.
+    :return: dict, or None when the file has no "key: value" line or as soon as a line needs a real YAML parser.
+    """
+    config = {}
+
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        # Indented lines belong to a nested block
+        if line[0].isspace():
+            return None
+
+        match = _FLAT_CONFIG_LINE.fullmatch(line.rstrip())
+        if match is None:
+            return None
+        key, raw_value = match.groups()
+
+        if key.lower() in _YAML_BOOL_WORDS or key.lower() in ("true", "false", "null"):
+            return None
+
+        value = _parse_flat_scalar(raw_value)
+        if value is _NOT_FLAT:
+            return None
+        config[key] = value
+
+    # Only the marker and comments: YAML reads that as None, leave it to the YAML parser
+    return config or None
+
+
+def _parse_flat_scalar(raw_value: str):
+    """
+    Convert one scalar of a flat config line the way YAML would.
+
+    :param raw_value: Text after "key:".
+    :return: Parsed value, or _NOT_FLAT when the YAML parser is needed.
+    """
+    # Empty values are either null or the start of a nested block, trailing comments are left to YAML as well
+    if not raw_value or " #" in raw_value or ": " in raw_value:
+        return _NOT_FLAT
+
+    # Quoted strings without escapes or embedded quotes
+    if raw_value[0] in "\"'":
+        quote = raw_value[0]
+        inner = raw_value[1:-1]
+        if len(raw_value) < 2 or raw_value[-1] != quote or quote in inner or "\\" in inner:
+            return _NOT_FLAT
+        return inner
+
+    if raw_value in ("~", "null", "Null", "NULL"):
+        return None
+    if raw_value in ("true", "True", "TRUE"):
+        return True
+    if raw_value in ("false", "False", "FALSE"):
+        return False
+    if _FLAT_CONFIG_INT.fullmatch(raw_value):
+        return int(raw_value)
+    if _FLAT_CONFIG_FLOAT.fullmatch(raw_value):
+        return float(raw_value)
+    if _FLAT_CONFIG_STRING.fullmatch(raw_value) and raw_value.lower() not in _YAML_BOOL_WORDS:
+        return raw_value
+
+    return _NOT_FLAT
+
+
+def load_config_keys(*dotted_paths: str, config_path: str = "config/config.yaml") -> Mapping:
+    """
+    Read only some values of a config file, e.g. load_config_keys("postgres.host", "log_file_path").
+
+    The YAML file is walked as a stream of parser events and only the requested values are built, parsing stops as
+    soon as all of them were found. Worth it for large config files when a module needs a handful of keys.
+    Keys are matched by their text. Falls back to load_config() when the file uses aliases or non-scalar keys, and
+    uses its cache when the whole config is already parsed. Results are cached per file, modification time and keys.
+
+    :param dotted_paths: Keys to read, nested keys joined with ".".
+    :param config_path: Path to config file relative to the project root.
+    :return: Mapping: Read-only {dotted_path: value}, values frozen like load_config(). KeyError when a key does not
+        exist.
+    """
+    full_config_path = os.path.join(_PROJECT_ROOT_STR, config_path)
+
+    try:
+        mtime_ns = os.stat(full_config_path).st_mtime_ns
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(
+            exc.errno, f"Configuration file not found at {full_config_path}", full_config_path
+        ) from None
+
+    cache_key = (full_config_path, mtime_ns, dotted_paths)
+    cached = _CONFIG_KEYS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    parsed = _CONFIG_CACHE.get(full_config_path)
+    if parsed is not None and parsed[0] == mtime_ns:
+        values = _lookup_config_keys(parsed[1], dotted_paths)
+    else:
+        with _open_noatime(full_config_path) as file:
+            values = _stream_config_keys(file, dotted_paths)
+        if values is None:
+            values = _lookup_config_keys(load_config(config_path), dotted_paths)
+
+    values = MappingProxyType({path: _freeze(value) for path, value in values.items()})
+    _CONFIG_KEYS_CACHE[cache_key] = values
+    return values
+
+
+def _lookup_config_keys(config, dotted_paths) -> dict:
+    """
+    Pick dotted keys out of an already parsed config.
+
+    :param config: Parsed config.
+    :param dotted_paths: Keys to read, nested keys joined with ".".
+    :return: dict: {dotted_path: value}
+    """
+    values = {}
+    for dotted_path in dotted_paths:
+        node = config
+        try:
+            for key in dotted_path.split("."):
+                node = node[key]
+        except (KeyError, TypeError):
+            raise KeyError(f"Config key not found: {dotted_path}") from None
+        values[dotted_path] = node
+    return values
+
+
+def _stream_config_keys(stream, dotted_paths):
+    """
+    Walk the YAML parser events of "stream" and build only the values at "dotted_paths".
+
+    Mappings are only entered when a requested key lies below them, everything else is skipped event by event without
+    building python objects. Parsing stops once every requested value was found.
+
+    :param stream: Open config file.
+    :param dotted_paths: Keys to read, nested keys joined with ".".
+    :return: dict: {dotted_path: value}, or None when the document needs a full parse (aliases, non-scalar keys,
+        one requested key nested below another).
+    """
+    import yaml
+
+    wanted = set(dotted_paths)
+    # Mappings at these paths contain a requested key and are walked into
+    parents = set()
+    for path in wanted:
+        parts = path.split(".")
+        parents.update(".".join(parts[:i]) for i in range(1, len(parts)))
+    if wanted & parents:
+        return None
+
+    values = {}
+    keys = []             # key path of the node being read
+    expecting_key = []    # per mapping walked into: True when its next node is a key
+    skip_depth = 0        # > 0 while skipping a collection nobody asked for
+    captured = None       # events of a requested value
+    capture_depth = 0
+
+    for event in yaml.parse(stream, Loader=_get_yaml_loader()):
+        if isinstance(event, yaml.AliasEvent) and skip_depth == 0:
+            return None
+
+        if captured is not None:
+            captured.append(event)
+            if isinstance(event, yaml.CollectionStartEvent):
+                capture_depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                capture_depth -= 1
+            if capture_depth == 0:
+                values[".".join(keys)] = _events_to_value(captured)
+                captured = None
+                keys.pop()
+                if len(values) == len(wanted):
+                    break
+            continue
+
+        if skip_depth:
+            if isinstance(event, yaml.CollectionStartEvent):
+                skip_depth += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                skip_depth -= 1
+                if skip_depth == 0:
+                    keys.pop()
+            continue
+
+        if isinstance(event, yaml.DocumentEndEvent):
+            break
+        if not isinstance(event, yaml.NodeEvent) and not isinstance(event, yaml.CollectionEndEvent):
+            # Stream / document start
+            continue
+
+        if isinstance(event, yaml.MappingEndEvent):
+            expecting_key.pop()
+            if keys:
+                keys.pop()
+            continue
+
+        if not expecting_key:
+            # Root node, only a mapping can hold the requested keys
+            if not isinstance(event, yaml.MappingStartEvent):
+                break
+            expecting_key.append(True)
+            continue
+
+        if expecting_key[-1]:
+            if not isinstance(event, yaml.ScalarEvent):
+                return None
+            keys.append(event.value)
+            expecting_key[-1] = False
+            continue
+
+        # Value of keys[-1]
+        expecting_key[-1] = True
+        path = ".".join(keys)
+
+        if path in wanted:
+            captured = [event]
+            capture_depth = 1 if isinstance(event, yaml.CollectionStartEvent) else 0
+            if capture_depth == 0:
+                values[path] = _events_to_value(captured)
+                captured = None
+                keys.pop()
+                if len(values) == len(wanted):
+                    break
+        elif path in parents and isinstance(event, yaml.MappingStartEvent):
+            expecting_key.append(True)
+        elif isinstance(event, yaml.CollectionStartEvent):
+            skip_depth = 1
+        else:
+            keys.pop()
+
+    missing = [path for path in dotted_paths if path not in values]
+    if missing:
+        raise KeyError(f"Config key not found: {', '.join(missing)}")
+
+    return values
+
+
+def _events_to_value(events):
+    """
+    Build the python value of one YAML node from its parser events.
+
+    :param events: Events of a single node (scalar, or collection start to matching end).
+    :return: Parsed value.
+    """
+    import yaml
+
+    document = [
+        yaml.StreamStartEvent(), yaml.DocumentStartEvent(), *events, yaml.DocumentEndEvent(), yaml.StreamEndEvent()
+    ]
+    return _parse_yaml(yaml.emit(document))
+
+
+def clear_config_cache() -> None:
+    """
+    Forget every parsed config and the registered run config, the next load_config() call reads the YAML file again
+    (mainly for tests).
+
+    :return: None
+    """
+    global _CONFIG_SINGLETON
+    _CONFIG_CACHE.clear()
+    _CONFIG_KEYS_CACHE.clear()
+    _CONFIG_SINGLETON = None
+
+
+class _BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler appending to the log through one O_APPEND file descriptor and a large write buffer.
+
+    logging.FileHandler flushes the file after every record, this one only flushes for ERROR and above records, when
+    the buffer is full and when it is flushed/closed explicitly (MemoryHandler batches, logging.shutdown() at exit).
+    The buffer is flushed before a record would overflow it, so every write() ends on a record boundary and records
+    of concurrent ETL processes don't interleave.
+
+    The file size is tracked instead of seeking to the end for every record (RotatingFileHandler.shouldRollover()
+    would flush the buffer each time). It is re-read after each flush, writes of other processes count from then on.
+    max_bytes=0 never rotates.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0):
+        self._size = 0
+        self._pending = 0
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+
+    def _open(self):
+        fd = os.open(self.baseFilename, LOG_FILE_OPEN_FLAGS, 0o644)
+        # Binary stream, records are encoded in emit() so the buffered byte count is exact
+        stream = os.fdopen(fd, "ab", buffering=LOG_FILE_BUFFER_BYTES)
+        self._size = os.fstat(fd).st_size
+        self._pending = 0
+        return stream
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding, self.errors or "strict")
+
+            if self.stream is None:
+                self.stream = self._open()
+
+            written = self._size + self._pending
+            if 0 < self.maxBytes < written + len(data) and written > 0:
+                self.doRollover()
+            elif self._pending + len(data) > LOG_FILE_BUFFER_BYTES:
+                self.flush()
+
+            self.stream.write(data)
+            self._pending += len(data)
+
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+                self._size = os.fstat(self.stream.fileno()).st_size
+                self._pending = 0
+
+
+def exit_on_sigterm() -> None:
+    """
+    Turn SIGTERM into SystemExit for the whole process, so atexit hooks and logging.shutdown() flush the buffered log
+    records. Process level setup: call it from the entry point (main.py), setup_logging() does not install it.
+
+    The default SIGTERM action kills the process without running atexit hooks, so buffered log records would be lost.
+    The handler itself does no logging I/O: it runs between two bytecodes of the main thread, which may be holding the
+    lock of the log queue or of a handler at that moment, and taking those locks again would deadlock.
+    A SIGTERM handler installed before (ignored or callable) is kept as is.
+
+    Python runs signal handlers only between bytecodes of the main thread: while it is blocked in a C call (libpq
+    query, COPY) the SystemExit is raised once that call returns.
+
+    :return: None
+    """
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    if previous_handler != signal.SIG_DFL:
+        return
+
+    def _handle_sigterm(signum, frame):
+        raise SystemExit(128 + signum)
+
+    try:
+        signal.signal(signal.SIGTERM, _handle_sigterm)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        pass
 
 
-def setup_logging(log_file_path: str, level: str = "INFO") -> logging.Logger:
+def setup_logging(
+    log_file_path: str, level: str = "INFO", max_bytes: int = 0, backup_count: int = 0
+) -> logging.Logger:
     """
     The below green part is known as DocString of a function, which provides the clarity for the purpose & usage of it.
     "logging.Logger" after a sign "->" is known as return annotation or return type hint of a function. (Shared below).
@@ -112,14 +773,48 @@ def setup_logging(log_file_path: str, level: str = "INFO") -> logging.Logger:
     a class of library logging.
 
     Setup logging configuration.
-    Setup logging configuration ONCE for the application/run.
+    Setup logging configuration ONCE for the application/run. The first call builds the handlers, every later call
+    returns the same logger right away (its arguments are ignored then).
+
+    Logging calls only put the record on a queue, a background QueueListener thread does the actual console and file
+    I/O. Records for the log file are additionally buffered in memory and written in batches (immediately on ERROR
+    and above, and when the process exits). Console output is not buffered.
+    No signal handlers are installed here: without exit_on_sigterm() (main.py calls it) a SIGTERM kills the process
+    without flushing the buffered records.
+
+    The log file is rotated once it would grow beyond "max_bytes", keeping "backup_count" old files
+    (etl.log.1, etl.log.2, ...). With the default max_bytes=0 it is never rotated.
 
     :param log_file_path:  Path to log file with a string datatype.
     :param level: Logging level with default value already given.
+    :param max_bytes: Size in bytes at which the log file is rotated, 0 disables rotation.
+    :param backup_count: Number of rotated log files to keep.
     :return:
     """
-    project_root = get_project_root()
-    full_log_path = project_root / log_file_path
+    global _LOGGER
+
+    # Fast path, no locking once logging is set up
+    if _LOGGER is not None:
+        return _LOGGER
+
+    with _LOGGER_LOCK:
+        if _LOGGER is None:
+            _LOGGER = _setup_once(log_file_path, level, max_bytes, backup_count)
+
+    return _LOGGER
+
+
+def _setup_once(log_file_path: str, level: str, max_bytes: int, backup_count: int) -> logging.Logger:
+    """
+    Build the formatter and handlers and attach them to the root logger, called once by setup_logging().
+
+    :param log_file_path:  Path to log file with a string datatype.
+    :param level: Logging level.
+    :param max_bytes: Size in bytes at which the log file is rotated, 0 disables rotation.
+    :param backup_count: Number of rotated log files to keep.
+    :return: logging.Logger: Root logger
+    """
+    full_log_path = os.path.join(_PROJECT_ROOT_STR, log_file_path)
 
     # Full_log_path value will be given at the time of calling the function.
 
@@ -127,26 +822,53 @@ def setup_logging(log_file_path: str, level: str = "INFO") -> logging.Logger:
     logger = logging.getLogger()
 
     # Setting value of logger variable that we defined above
-    logger.setLevel(getattr(logging, level))
-
-    if logger.handlers:
-        return
+    try:
+        logger.setLevel(_LEVELS[level.upper()])
+    except KeyError:
+        raise ValueError(f"Invalid logging level {level!r}, expected one of: {', '.join(_LEVELS)}") from None
 
     # Create log formatter Or we can setting-up formatter for logging
+    # "{" style with validate=False skips the format string validation and formats slightly faster than "%" style,
+    # the output is the same as "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
     formatter = logging.Formatter(
-        "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+        "{asctime} - {levelname} - {name} - {message}", style="{", validate=False
     )
 
-    # File handlers (write logs to the file)
-    file_handler = logging.FileHandler(full_log_path)
+    # File handlers (write logs to the file), buffered instead of flushing the file after every record
+    file_handler = _BufferedRotatingFileHandler(full_log_path, max_bytes, backup_count)
     file_handler.setFormatter(formatter)
 
     # prints logs to terminal/console or Python Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
+    # Buffer file records in memory instead of one write per record, the file handler receives them in batches
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+
+    # Move the handler I/O off the calling thread: the root logger only enqueues records, the listener thread hands
+    # them to the console and (buffered) file handlers
+    # SimpleQueue: put() is a single C call without a python level lock, so SystemExit raised by the SIGTERM
+    # handler (exit_on_sigterm()) in the middle of a logging call cannot leave the queue locked for the atexit drain
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue, memory_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    logger._listener = listener
+
+    # Make sure buffered records reach the file when the run ends (also on SIGTERM once exit_on_sigterm() is used).
+    # atexit runs hooks in reverse order: the listener is drained first, then the memory buffer is flushed, and
+    # logging.shutdown() (registered when logging was imported) finally flushes and closes the file handler.
+    atexit.register(memory_handler.flush)
+    atexit.register(listener.stop)
+
     # Attach handlers to root logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    logger.addHandler(queue_handler)
 
     return logger
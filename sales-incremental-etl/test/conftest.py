@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules in src/ import each other by plain module name (from utils import ...), same as when running main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
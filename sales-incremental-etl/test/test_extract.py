@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import extract
+from extract import extract_data
+
+logger = logging.getLogger("test_extract")
+
+HEADER = "order_id,order_date,customer_id,product,quantity,price"
+
+ROWS = [
+    "1,2024-01-01,10,Laptop,1,800",
+    "2,2024-01-05,11,Mouse,2,20",
+    "3,notadate,12,Laptop,1,800",
+    "4,2024-01-10,13,Keyboard,,45.5",
+    "5,2023-12-31,14,Mouse,3,20",
+]
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    def _write(lines, name="sales.csv"):
+        path = tmp_path / name
+        path.write_text("\n".join(lines) + "\n")
+        return {"raw_data_path": str(path)}
+
+    return _write
+
+
+def test_without_watermark_nothing_is_filtered(raw_csv):
+    df = extract_data(raw_csv([HEADER, *ROWS]), logger)
+
+    assert df["order_id"].tolist() == [1, 2, 3, 4, 5]
+    # order_date is converted once while extracting, invalid dates become NaT
+    assert pd.api.types.is_datetime64_any_dtype(df["order_date"])
+    assert df["order_date"].isna().tolist() == [False, False, True, False, False]
+
+
+@pytest.mark.parametrize("chunk_size", [extract.EXTRACT_CHUNK_SIZE, 2, 1])
+def test_only_rows_newer_than_the_watermark_are_kept(raw_csv, monkeypatch, chunk_size, caplog):
+    monkeypatch.setattr(extract, "EXTRACT_CHUNK_SIZE", chunk_size)
+
+    with caplog.at_level(logging.WARNING, logger="test_extract"):
+        df = extract_data(raw_csv([HEADER, *ROWS]), logger, last_watermark=datetime(2024, 1, 1))
+
+    # 2024-01-01 equals the watermark and is already loaded, the NaT row is kept for the data quality checks
+    assert df["order_id"].tolist() == [2, 3, 4]
+    assert df["order_date"].isna().tolist() == [False, True, False]
+    assert "Kept 1 rows with invalid order_date" in caplog.text
+
+
+def test_watermark_as_string_and_nothing_new(raw_csv):
+    df = extract_data(raw_csv([HEADER, ROWS[0], ROWS[4]]), logger, last_watermark="2024-06-01")
+
+    assert df.empty
+    assert list(df.columns) == HEADER.split(",")
+
+
+@pytest.mark.parametrize("sep", [";", "\t", "|"])
+def test_delimiter_is_sniffed(raw_csv, sep):
+    config = raw_csv([line.replace(",", sep) for line in [HEADER, *ROWS]])
+
+    df = extract_data(config, logger)
+
+    assert list(df.columns) == HEADER.split(",")
+    assert df["order_id"].tolist() == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize("chunk_size", [extract.EXTRACT_CHUNK_SIZE, 2])
+def test_packed_single_column_csv_is_repaired(raw_csv, monkeypatch, chunk_size):
+    # Excel export with every line quoted as one field
+    monkeypatch.setattr(extract, "EXTRACT_CHUNK_SIZE", chunk_size)
+    packed = raw_csv([f'"{line}"' for line in [HEADER, *ROWS]])
+
+    df = extract_data(packed, logger, last_watermark=datetime(2024, 1, 1))
+    plain = extract_data(raw_csv([HEADER, *ROWS], name="plain.csv"), logger, last_watermark=datetime(2024, 1, 1))
+
+    assert list(df.columns) == HEADER.split(",")
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), plain.reset_index(drop=True))
+
+
+def test_missing_columns_are_rejected(raw_csv):
+    with pytest.raises(ValueError, match="price"):
+        extract_data(raw_csv(["order_id,order_date,customer_id,product,quantity", "1,2024-01-01,10,Laptop,1"]), logger)
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        extract_data({"raw_data_path": str(tmp_path / "missing.csv")}, logger)
@@ -0,0 +1,154 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+import incremental
+from incremental import (
+    get_last_watermark, save_watermark, update_cached_watermark, invalidate_watermark, WATERMARK_TABLE
+)
+
+logger = logging.getLogger("test_incremental")
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeConnection:
+    """Records executed SQL, answers with the first scripted result whose key is part of the statement."""
+
+    def __init__(self, results):
+        self.results = results
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        for fragment, value in self.results.items():
+            if fragment in sql:
+                if isinstance(value, Exception):
+                    raise value
+                return _Result(value)
+        return _Result(None)
+
+    def sql(self):
+        return [sql for sql, _ in self.statements]
+
+
+class FakeEngine:
+    def __init__(self, results):
+        self.conn = FakeConnection(results)
+        self.calls = []
+
+    @contextmanager
+    def connect(self):
+        self.calls.append("connect")
+        yield self.conn
+
+    @contextmanager
+    def begin(self):
+        self.calls.append("begin")
+        yield self.conn
+
+
+@pytest.fixture(autouse=True)
+def clear_watermark_cache():
+    incremental._WATERMARK_CACHE.clear()
+    yield
+    incremental._WATERMARK_CACHE.clear()
+
+
+def test_watermark_is_read_from_the_metadata_table():
+    engine = FakeEngine({"to_regclass": True, f"FROM data.{WATERMARK_TABLE}": datetime(2024, 1, 5)})
+
+    assert get_last_watermark(engine, "data", "sales_orders", logger) == datetime(2024, 1, 5)
+
+    assert not any("MAX(order_date)" in sql for sql in engine.conn.sql())
+    assert engine.conn.statements[1][1] == {"table_name": "sales_orders"}
+
+
+@pytest.mark.parametrize("table_exists", [True, False])
+def test_missing_watermark_falls_back_to_max_order_date_read_only(table_exists):
+    engine = FakeEngine({"to_regclass": table_exists, "MAX(order_date)": datetime(2023, 12, 31)})
+
+    assert get_last_watermark(engine, "data", "sales_orders", logger) == datetime(2023, 12, 31)
+
+    # No transaction, no DDL and no watermark write on the lookup path
+    assert engine.calls == ["connect"]
+    assert not any(keyword in sql.upper() for sql in engine.conn.sql() for keyword in ("CREATE", "INSERT"))
+    # The metadata table is only queried when it exists
+    assert any(f"FROM data.{WATERMARK_TABLE}" in sql for sql in engine.conn.sql()) == table_exists
+
+
+def test_empty_target_has_no_watermark():
+    engine = FakeEngine({"to_regclass": False})
+
+    assert get_last_watermark(engine, "data", "sales_orders", logger) is None
+
+
+def test_cache_hit_skips_the_database():
+    engine = FakeEngine({"to_regclass": True, f"FROM data.{WATERMARK_TABLE}": datetime(2024, 1, 5)})
+
+    get_last_watermark(engine, "data", "sales_orders", logger)
+    assert get_last_watermark(engine, "data", "sales_orders", logger) == datetime(2024, 1, 5)
+
+    assert engine.calls == ["connect"]
+
+
+def test_cache_is_per_schema_and_table():
+    engine = FakeEngine({"to_regclass": True, f"FROM data.{WATERMARK_TABLE}": datetime(2024, 1, 5)})
+
+    get_last_watermark(engine, "data", "sales_orders", logger)
+    get_last_watermark(engine, "data", "returns", logger)
+
+    assert engine.calls == ["connect", "connect"]
+
+
+def test_update_cached_watermark_never_moves_backwards():
+    engine = FakeEngine({"to_regclass": True, f"FROM data.{WATERMARK_TABLE}": datetime(2024, 1, 5)})
+    get_last_watermark(engine, "data", "sales_orders", logger)
+
+    update_cached_watermark("data", "sales_orders", datetime(2024, 2, 1))
+    update_cached_watermark("data", "sales_orders", datetime(2024, 1, 10))
+
+    assert get_last_watermark(engine, "data", "sales_orders", logger) == datetime(2024, 2, 1)
+    assert engine.calls == ["connect"]
+
+
+def test_invalidate_watermark_clears_the_cache():
+    engine = FakeEngine({"to_regclass": True, f"FROM data.{WATERMARK_TABLE}": datetime(2024, 1, 5)})
+    update_cached_watermark("data", "sales_orders", datetime(2024, 2, 1))
+
+    invalidate_watermark("data", "sales_orders")
+    invalidate_watermark("data", "sales_orders")          # no error when nothing is cached
+
+    assert get_last_watermark(engine, "data", "sales_orders", logger) == datetime(2024, 1, 5)
+    assert engine.calls == ["connect"]
+
+
+def test_failed_lookup_is_not_cached():
+    failing = FakeEngine({"to_regclass": RuntimeError("connection lost")})
+
+    with pytest.raises(RuntimeError):
+        get_last_watermark(failing, "data", "sales_orders", logger)
+
+    assert ("data", "sales_orders") not in incremental._WATERMARK_CACHE
+
+
+def test_save_watermark_upserts_with_greatest():
+    conn = FakeConnection({})
+
+    save_watermark(conn, "data", "sales_orders", datetime(2024, 1, 5))
+
+    (sql, params), = conn.statements
+    assert f"INSERT INTO data.{WATERMARK_TABLE}" in sql
+    assert "ON CONFLICT (table_name)" in sql
+    # The stored watermark never moves backwards, e.g. when an older file is reprocessed
+    assert f"GREATEST(data.{WATERMARK_TABLE}.last_order_date, EXCLUDED.last_order_date)" in sql
+    assert params == {"table_name": "sales_orders", "last_order_date": datetime(2024, 1, 5)}
@@ -0,0 +1,228 @@
+import csv
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+import load_postgres
+import utils
+from checkpoints import EXPECTED_SCHEMA, check_staging_quality
+from load_postgres import LOAD_COLUMNS, _copy_buffer, load_to_postgres
+
+logger = logging.getLogger("test_load_postgres")
+
+
+class _Result:
+    def __init__(self, row):
+        self.row = row
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self.row
+
+
+class StubConnection:
+    def __init__(self, row=None):
+        self.row = row
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return _Result(self.row)
+
+
+class StubRawConnection:
+    def __init__(self):
+        self.copies = []
+        self.committed = False
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def copy_expert(self, sql, buffer):
+        self.copies.append((sql, buffer.read()))
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        self.closed = True
+
+
+class StubEngine:
+    def __init__(self, conn):
+        self.conn = conn
+        self.raw = StubRawConnection()
+
+    def raw_connection(self):
+        return self.raw
+
+    @contextmanager
+    def connect(self):
+        yield self.conn
+
+    @contextmanager
+    def begin(self):
+        yield self.conn
+
+
+# =========================
+# check_staging_quality()
+# =========================
+
+PASSING_COUNTERS = {"null_count": 0, "quantity_count": 0, "price_count": 0, "duplicate_count": 0}
+
+
+def test_staging_quality_counters_are_one_query():
+    conn = StubConnection(PASSING_COUNTERS)
+
+    check_staging_quality(StubEngine(conn), "data", "sales_orders_staging", logger)
+
+    (sql, _), = conn.statements
+    sql = " ".join(sql.split())
+    assert "FROM data.sales_orders_staging" in sql
+    null_condition = " OR ".join(f"{column} IS NULL" for column in EXPECTED_SCHEMA)
+    assert f"SUM(CASE WHEN {null_condition} THEN 1 ELSE 0 END), 0) AS null_count" in sql
+    assert "SUM(CASE WHEN quantity <= 0 THEN 1 ELSE 0 END), 0) AS quantity_count" in sql
+    assert "SUM(CASE WHEN price <= 0 THEN 1 ELSE 0 END), 0) AS price_count" in sql
+    assert "COUNT(order_id) - COUNT(DISTINCT order_id) AS duplicate_count" in sql
+
+
+@pytest.mark.parametrize("counter, message", [
+    ("null_count", "Null values found"),
+    ("quantity_count", "Quantity must be > 0"),
+    ("price_count", "Price must be > 0"),
+    ("duplicate_count", "Duplicate order_id found: 3"),
+])
+def test_staging_quality_rejects_each_nonzero_counter(counter, message):
+    conn = StubConnection({**PASSING_COUNTERS, counter: 3})
+
+    with pytest.raises(ValueError, match=message):
+        check_staging_quality(StubEngine(conn), "data", "sales_orders_staging", logger)
+
+
+# =========================
+# COPY buffer and load sequence
+# =========================
+
+def _transformed(**columns):
+    data = {
+        "order_id": np.array([1, 2], dtype="int64"),
+        "order_date": pd.to_datetime(["2024-01-05 10:30:00", "2024-01-06 00:00:00"]),
+        "customer_id": np.array([10, 11], dtype="int64"),
+        "product": pd.Categorical(["Laptop", "Mouse"]),
+        "quantity": np.array([23, 1], dtype="int32"),
+        "price": np.array([16310.91, 0.1], dtype="float64"),
+    }
+    data.update(columns)
+    df = pd.DataFrame(data)
+    df["revenue"] = df["quantity"] * df["price"]
+    # Columns in a different order than LOAD_COLUMNS, COPY must not depend on it
+    return df[list(reversed(df.columns))]
+
+
+def test_copy_buffer_follows_load_columns():
+    rows = list(csv.reader(_copy_buffer(_transformed())))
+
+    assert rows == [
+        ["1", "2024-01-05 10:30:00", "10", "Laptop", "23", "16310.91", "375150.93"],
+        ["2", "2024-01-06 00:00:00", "11", "Mouse", "1", "0.1", "0.1"],
+    ]
+    assert len(LOAD_COLUMNS) == len(rows[0])
+
+
+def test_copy_buffer_writes_missing_values_as_empty_fields():
+    df = _transformed(
+        order_date=pd.to_datetime(["2024-01-05", None]),
+        product=pd.Categorical(["Laptop", None]),
+        price=np.array([np.nan, 2.5]),
+    )
+
+    lines = _copy_buffer(df).read().splitlines()
+
+    # Empty unquoted fields are NULL for COPY ... (FORMAT CSV)
+    assert lines == ["1,2024-01-05,10,Laptop,23,,", "2,,11,,1,2.5,2.5"]
+
+
+def test_copy_buffer_keeps_float64_precision():
+    rng = np.random.default_rng(0)
+    price = rng.integers(1, 2_000_001, 1_000) / 100
+    df = _transformed(
+        order_id=np.arange(1_000), order_date=pd.to_datetime(["2024-01-05"] * 1_000),
+        customer_id=np.arange(1_000), product=pd.Categorical(["Laptop"] * 1_000),
+        quantity=rng.integers(1, 51, 1_000).astype("int32"), price=price,
+    )
+
+    rows = list(csv.reader(_copy_buffer(df)))
+
+    # Values read back are exactly the float64 values, so NUMERIC gets the same cents
+    assert [float(row[5]) for row in rows] == df["price"].tolist()
+    assert [float(row[6]) for row in rows] == df["revenue"].tolist()
+
+
+@pytest.fixture
+def load_setup(monkeypatch):
+    utils.set_config({"postgres": {"schema": "data", "table": "sales_orders"}})
+    monkeypatch.setattr(load_postgres, "check_staging_quality", lambda **kwargs: None)
+    monkeypatch.setattr(load_postgres, "get_last_watermark", lambda **kwargs: None)
+    incremental._WATERMARK_CACHE.clear()
+
+    yield StubEngine(StubConnection())
+
+    utils.clear_config_cache()
+    incremental._WATERMARK_CACHE.clear()
+
+
+def test_load_to_postgres_statement_sequence(load_setup, monkeypatch):
+    engine = load_setup
+    monkeypatch.setattr(load_postgres, "get_engine", lambda *args: pytest.fail("engine= was given"))
+    df = _transformed()
+
+    load_to_postgres(df, logger, engine=engine)
+
+    statements = [" ".join(sql.split()) for sql, _ in engine.conn.statements]
+    assert [sql.split(" (")[0].split(" FROM")[0] for sql in statements] == [
+        "CREATE TABLE IF NOT EXISTS data.sales_orders_staging",
+        "CREATE TABLE IF NOT EXISTS data.etl_watermarks",
+        "TRUNCATE data.sales_orders_staging",
+        "ANALYZE data.sales_orders_staging",
+        "INSERT INTO data.sales_orders",
+        "INSERT INTO data.etl_watermarks",
+        "TRUNCATE data.sales_orders_staging",
+    ]
+
+    (copy_sql, copied), = engine.raw.copies
+    assert copy_sql == f"COPY data.sales_orders_staging ({', '.join(LOAD_COLUMNS)}) FROM STDIN WITH (FORMAT CSV)"
+    assert copied == _copy_buffer(df).read()
+    assert engine.raw.committed and engine.raw.closed
+
+    # First load: no watermark yet, every staging row qualifies
+    merge_sql, merge_params = engine.conn.statements[4]
+    assert "WHERE order_date > :last_watermark" in merge_sql
+    assert merge_params == {"last_watermark": datetime.min}
+
+    # Newest order_date of the batch is recorded with the merge and cached for the next run
+    assert engine.conn.statements[5][1] == {"table_name": "sales_orders", "last_order_date": datetime(2024, 1, 6)}
+    assert incremental._WATERMARK_CACHE[("data", "sales_orders")] == datetime(2024, 1, 6)
+
+
+def test_load_to_postgres_builds_the_engine_when_not_given(load_setup, monkeypatch):
+    engine = load_setup
+    calls = []
+    monkeypatch.setattr(load_postgres, "get_engine", lambda pg_config, logger: calls.append(pg_config) or engine)
+
+    load_to_postgres(_transformed(), logger)
+
+    assert calls == [utils.get_config()["postgres"]]
+
+
+def test_load_to_postgres_rejects_an_empty_frame(load_setup):
+    with pytest.raises(ValueError):
+        load_to_postgres(_transformed().iloc[0:0], logger, engine=load_setup)
@@ -0,0 +1,96 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from transform import transform_data
+
+logger = logging.getLogger("test_transform")
+
+
+def _raw(**columns):
+    # Raw extract as read from the CSV: every value a string, order_date not converted yet.
+    # Columns not given repeat the defaults below for every row, order_id counts up.
+    rows = len(next(iter(columns.values()))) if columns else 1
+    data = {
+        "order_id": [str(i) for i in range(1, rows + 1)],
+        "order_date": ["2024-01-05"] * rows,
+        "customer_id": ["10"] * rows,
+        "product": ["Laptop"] * rows,
+        "quantity": ["2"] * rows,
+        "price": ["3.50"] * rows,
+    }
+    data.update(columns)
+    return pd.DataFrame(data)
+
+
+def test_price_is_parsed_from_the_price_column():
+    df = transform_data(_raw(quantity=["2", "7", "7"], price=["3.50", "abc", None]), logger)
+
+    assert df["price"].dtype == "float64"
+    # Built from price, not from quantity
+    assert df["price"].tolist() == [3.5, 0.0, 0.0]
+
+
+def test_missing_or_invalid_quantity_becomes_one():
+    df = transform_data(_raw(quantity=[None, "x", "4"]), logger)
+
+    assert df["quantity"].dtype == "int32"
+    assert df["quantity"].tolist() == [1, 1, 4]
+
+
+@pytest.mark.parametrize("order_date", [
+    ["2024-01-05", "notadate"],
+    pd.to_datetime(pd.Series(["2024-01-05", "notadate"]), errors="coerce"),    # already converted by extract_data()
+])
+def test_invalid_order_date_stays_nat(order_date):
+    df = transform_data(_raw(order_date=order_date), logger)
+
+    assert pd.api.types.is_datetime64_any_dtype(df["order_date"])
+    assert df["order_date"].isna().tolist() == [False, True]
+    # No sentinel date like 9999-99-99 / 9999-12-31 is filled in for invalid dates
+    assert df["order_date"].dropna().dt.year.max() == 2024
+
+
+def test_revenue_is_exact_to_the_cent():
+    df = transform_data(_raw(quantity=["23"], price=["16310.91"]), logger)
+
+    assert df["revenue"].dtype == "float64"
+    assert df["revenue"].iloc[0] == 23 * 16310.91
+    assert df.to_csv(columns=["revenue"], index=False, header=False).strip() == "375150.93"
+
+
+def test_revenue_cents_match_decimal_math():
+    rng = np.random.default_rng(0)
+    quantity = rng.integers(1, 51, 10_000)
+    cents = rng.integers(1, 2_000_001, 10_000)
+    df = transform_data(pd.DataFrame({
+        "order_id": np.arange(10_000),
+        "order_date": ["2024-01-05"] * 10_000,
+        "customer_id": ["10"] * 10_000,
+        "product": ["Laptop"] * 10_000,
+        "quantity": quantity.astype(str),
+        "price": [f"{cent // 100}.{cent % 100:02d}" for cent in cents],
+    }), logger)
+
+    assert (np.round(df["revenue"].to_numpy() * 100).astype("int64") == quantity * cents).all()
+
+
+def test_duplicate_order_ids_keep_the_first_row():
+    df = transform_data(_raw(order_id=["1", "1", "2"], quantity=["1", "2", "3"]), logger)
+
+    assert df["order_id"].tolist() == ["1", "2"]
+    assert df["quantity"].tolist() == [1, 3]
+    assert df.index.tolist() == [0, 1]
+
+
+def test_product_becomes_category():
+    df = transform_data(_raw(), logger)
+
+    assert isinstance(df["product"].dtype, pd.CategoricalDtype)
+
+
+def test_empty_frame_is_rejected():
+    with pytest.raises(ValueError):
+        transform_data(_raw().iloc[0:0], logger)
@@ -0,0 +1,562 @@
+import errno
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import textwrap
+from types import MappingProxyType
+
+import pytest
+import yaml
+
+import utils
+
+
+def _thaw(value):
+    # Frozen config (read-only mappings and tuples) back to plain dicts and lists, for comparing with yaml.safe_load
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _lookup(config, dotted_path):
+    for key in dotted_path.split("."):
+        config = config[key]
+    return config
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def _write(text, name="config.yaml"):
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+
+    yield _write
+    utils.clear_config_cache()
+
+
+# =========================
+# Frozen config, set_config() / get_config()
+# =========================
+
+def test_loaded_config_is_frozen(write_config):
+    path = write_config("postgres:\n  host: localhost\n  options: {retry: [1, 2]}\ntables: [a, {b: 1}]\n")
+
+    config = utils.load_config(path)
+
+    assert isinstance(config, MappingProxyType)
+    assert isinstance(config["postgres"]["options"], MappingProxyType)
+    assert config["postgres"]["options"]["retry"] == (1, 2)
+    assert isinstance(config["tables"], tuple) and isinstance(config["tables"][1], MappingProxyType)
+
+    with pytest.raises(TypeError):
+        config["postgres"] = {}
+    with pytest.raises(TypeError):
+        config["postgres"]["host"] = "elsewhere"
+    with pytest.raises(TypeError):
+        config["tables"][1]["b"] = 2
+    with pytest.raises(AttributeError):
+        config["postgres"]["options"]["retry"].append(3)
+
+    # Cache hit hands out the same frozen object, there is nothing to copy
+    assert utils.load_config(path) is config
+
+
+def test_freeze_leaves_scalars_alone():
+    frozen = utils._freeze({"a": [1, {"b": None}], "c": "text"})
+
+    assert frozen == {"a": (1, MappingProxyType({"b": None})), "c": "text"}
+    assert utils._freeze(5) == 5 and utils._freeze(None) is None
+
+
+def test_get_config_returns_the_registered_config(write_config):
+    config = utils.load_config(write_config("a: 1\n"))
+
+    utils.set_config(config)
+
+    assert utils.get_config() is config
+
+
+def test_get_config_falls_back_to_the_default_config():
+    utils.clear_config_cache()
+    try:
+        config = utils.get_config()
+
+        assert config is utils.load_config()
+        assert "postgres" in config
+        # Registered by the fallback, later calls do not load again
+        assert utils.get_config() is config
+    finally:
+        utils.clear_config_cache()
+
+
+# =========================
+# load_config() file access
+# =========================
+
+def test_missing_config_keeps_errno_and_filename(tmp_path):
+    path = str(tmp_path / "missing.yaml")
+
+    with pytest.raises(FileNotFoundError) as excinfo:
+        utils.load_config(path)
+
+    assert excinfo.value.errno == errno.ENOENT
+    assert excinfo.value.filename == path
+    assert "Configuration file not found" in str(excinfo.value)
+    # "from None": no second traceback of the OS level error
+    assert excinfo.value.__suppress_context__
+
+
+@pytest.mark.skipif(not hasattr(os, "O_NOATIME"), reason="O_NOATIME is Linux only")
+def test_config_opened_with_o_noatime(write_config, monkeypatch):
+    path = write_config("a: 1\n")
+    flags = []
+    os_open = os.open
+    monkeypatch.setattr(utils.os, "open", lambda file, flag, *args: flags.append(flag) or os_open(file, flag, *args))
+
+    assert utils.load_config(path)["a"] == 1
+    assert flags[0] & os.O_NOATIME
+
+
+@pytest.mark.skipif(not hasattr(os, "O_NOATIME"), reason="O_NOATIME is Linux only")
+def test_o_noatime_permission_error_falls_back(write_config, monkeypatch):
+    # O_NOATIME on a file owned by another user fails with EPERM
+    path = write_config("a: 1\n")
+    flags = []
+    os_open = os.open
+
+    def _open(file, flag, *args):
+        flags.append(flag)
+        if flag & os.O_NOATIME:
+            raise PermissionError(errno.EPERM, "Operation not permitted", file)
+        return os_open(file, flag, *args)
+
+    monkeypatch.setattr(utils.os, "open", _open)
+
+    assert utils.load_config(path)["a"] == 1
+    assert flags[:2] == [os.O_RDONLY | os.O_NOATIME, os.O_RDONLY]
+
+
+def _spy_mmap(monkeypatch):
+    mapped = []
+    mmap_class = utils.mmap.mmap
+    monkeypatch.setattr(utils.mmap, "mmap", lambda *args, **kwargs: mapped.append(args) or mmap_class(*args, **kwargs))
+    return mapped
+
+
+def test_large_config_is_parsed_through_mmap(write_config, monkeypatch):
+    lines = [f"key_{i}: {{name: value {i}, items: [{i}, '{i}']}}" for i in range(2_000)]
+    text = "\n".join(lines) + "\n"
+    assert len(text.encode()) > utils.CONFIG_MMAP_THRESHOLD_BYTES
+    path = write_config(text)
+    mapped = _spy_mmap(monkeypatch)
+
+    assert _thaw(utils.load_config(path)) == yaml.safe_load(text)
+    assert len(mapped) == 1
+
+
+def test_small_config_is_read_without_mmap(write_config, monkeypatch):
+    path = write_config("a: 1\n")
+    mapped = _spy_mmap(monkeypatch)
+
+    assert utils.load_config(path)["a"] == 1
+    assert not mapped
+
+
+# =========================
+# load_config() JSON copy
+# =========================
+
+def _no_yaml_parse(*args):
+    pytest.fail("YAML was parsed instead of served from the JSON copy")
+
+
+def test_sidecar_is_served_without_parsing_yaml(write_config, monkeypatch):
+    path = write_config("postgres:\n  host: localhost\n  port: 5432\n")
+    expected = utils.load_config(path)
+    assert os.path.exists(path + ".cache.json")
+
+    # New process: empty in-process cache, only the JSON copy
+    utils.clear_config_cache()
+    monkeypatch.setattr(utils, "_parse_yaml", _no_yaml_parse)
+
+    assert _thaw(utils.load_config(path)) == _thaw(expected)
+
+
+def test_sidecar_is_stale_after_restoring_an_older_config(write_config, tmp_path):
+    path = write_config("postgres:\n  password: old\n")
+    shutil.copy2(path, tmp_path / "backup.yaml")
+
+    write_config("postgres:\n  password: new-password\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+    assert utils.load_config(path)["postgres"]["password"] == "new-password"
+
+    # cp -p: the restored YAML is older than the JSON copy written for the new one
+    shutil.copy2(tmp_path / "backup.yaml", path)
+    utils.clear_config_cache()
+
+    assert utils.load_config(path)["postgres"]["password"] == "old"
+
+
+def test_sidecar_is_stale_after_same_size_replace_with_same_mtime(write_config, tmp_path):
+    path = write_config("password: aaaa\n")
+    utils.load_config(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    # Same size, same mtime, but a different file (new inode), e.g. extracted from an archive
+    replacement = tmp_path / "replacement.yaml"
+    replacement.write_text("password: bbbb\n")
+    os.utime(replacement, ns=(mtime_ns, mtime_ns))
+    os.replace(replacement, path)
+    utils.clear_config_cache()
+
+    assert utils.load_config(path)["password"] == "bbbb"
+
+
+def test_sidecar_without_source_is_ignored(write_config):
+    path = write_config("a: 1\n")
+    with open(path + ".cache.json", "w") as file:
+        json.dump({"a": 2}, file)                   # old format: plain config, no source
+
+    assert utils.load_config(path)["a"] == 1
+
+
+def test_yml_and_yaml_configs_have_separate_sidecars(write_config):
+    yaml_path = write_config("name: yaml\n", name="config.yaml")
+    yml_path = write_config("name: yml\n", name="config.yml")
+
+    assert utils.load_config(yaml_path)["name"] == "yaml"
+    assert utils.load_config(yml_path)["name"] == "yml"
+
+    utils.clear_config_cache()
+    assert utils.load_config(yaml_path)["name"] == "yaml"
+    assert utils.load_config(yml_path)["name"] == "yml"
+
+
+@pytest.mark.parametrize("mode", [0o600, 0o640, 0o644])
+def test_sidecar_is_not_more_readable_than_the_yaml(write_config, mode):
+    path = write_config("postgres:\n  password: secret\n")
+    os.chmod(path, mode)
+
+    utils.load_config(path)
+
+    assert os.stat(path + ".cache.json").st_mode & 0o777 & ~mode == 0
+
+
+@pytest.mark.parametrize("text", [
+    "start: 2024-01-01\n",                        # date
+    "1: one\n",                                   # non-string key
+    "- a\n- b\n",                                 # not a mapping
+    "ratio: .nan\n",                              # NaN != NaN after the round trip
+])
+def test_non_json_safe_config_writes_no_sidecar(write_config, text):
+    path = write_config(text)
+
+    utils.load_config(path)
+
+    assert not os.path.exists(path + ".cache.json")
+
+
+# =========================
+# load_config_fast()
+# =========================
+
+@pytest.mark.parametrize("raw_value, fast", [
+    # ints
+    ("0", True), ("42", True), ("-7", True), ("+3", True), ("012", False), ("1_000", False), ("0x1A", False),
+    # floats
+    ("1.5", True), ("-0.25", True), ("1.0e+3", True), ("1e3", False), ("1.5e3", False), (".5", False),
+    ("1.", False), (".inf", False),
+    # booleans
+    ("true", True), ("False", True), ("TRUE", True), ("yes", False), ("No", False), ("on", False), ("OFF", False),
+    ("y", False),
+    # null
+    ("~", True), ("null", True), ("NULL", True), ("", False),
+    # quoted
+    ("'abc'", True), ('"a b"', True), ("''", True), ("'it''s'", False), ('"a\\tb"', False),
+    # plain strings
+    ("logs/etl.log", True), ("data_raw", True), ("localhost", True), ("a b c", False),
+    # dates
+    ("2024-01-01", False), ("2024-01-01 12:00:00", False),
+    # everything else
+    ("[1, 2]", False), ("{a: 1}", False), ("5 # comment", False), ("&anchor x", False), ("!!str 5", False)
+])
+def test_load_config_fast_matches_safe_load(write_config, monkeypatch, raw_value, fast):
+    text = f"{utils.FAST_PARSE_MARKER}\nkey: {raw_value}\nother: 1\n"
+    path = write_config(text)
+
+    calls = []
+    load_config = utils.load_config
+    monkeypatch.setattr(utils, "load_config", lambda *args: calls.append(args) or load_config(*args))
+
+    config = utils.load_config_fast(path)
+
+    expected = yaml.safe_load(text)
+    assert _thaw(config) == expected
+    assert type(_thaw(config)["key"]) is type(expected["key"])
+    assert (not calls) == fast
+
+
+@pytest.mark.parametrize("text", [
+    f"{utils.FAST_PARSE_MARKER}\n",
+    f"{utils.FAST_PARSE_MARKER}\n# only comments\n\n",
+    f"{utils.FAST_PARSE_MARKER}\npostgres:\n  host: localhost\n",
+    f"{utils.FAST_PARSE_MARKER}\nyes: 1\n",
+    "host: localhost\n",
+])
+def test_load_config_fast_fallback_matches_safe_load(write_config, text):
+    path = write_config(text)
+
+    assert _thaw(utils.load_config_fast(path)) == yaml.safe_load(text)
+
+
+# =========================
+# load_config_keys()
+# =========================
+
+NESTED_CONFIG = """\
+log_file_path: logs/etl.log
+logging:
+  level: INFO
+postgres:
+  host: localhost
+  port: 5432
+  password: '0123'
+  schema: "data"
+  options:
+    connect_timeout: 10
+    retry: [1, 2, {backoff: 0.5}]
+skipped:
+  - {a: 1}
+  - [2, 3]
+flow: {x: [1, 2], y: {z: null}, w: 'a: b'}
+flags: {on_off: on, tilde: ~, date: 2024-01-01}
+last: end
+"""
+
+
+@pytest.mark.parametrize("dotted_paths", [
+    ("postgres.host", "postgres.port"),
+    ("postgres.password", "postgres.schema"),
+    ("postgres.options.retry", "postgres.options.connect_timeout"),
+    ("postgres.options",),
+    ("logging", "log_file_path"),
+    ("flow",),
+    ("flow.x", "flow.y.z", "flow.w"),
+    ("flags.on_off", "flags.tilde", "flags.date"),
+    ("skipped", "last"),
+])
+def test_load_config_keys_matches_safe_load(write_config, monkeypatch, dotted_paths):
+    path = write_config(NESTED_CONFIG)
+    expected = yaml.safe_load(NESTED_CONFIG)
+
+    # Plain documents must be served by the event walker, not by the full parse fallback
+    monkeypatch.setattr(utils, "load_config", lambda *args: pytest.fail("fell back to load_config()"))
+
+    values = utils.load_config_keys(*dotted_paths, config_path=path)
+
+    assert {key: _thaw(value) for key, value in values.items()} == {
+        dotted_path: _lookup(expected, dotted_path) for dotted_path in dotted_paths
+    }
+
+
+def test_load_config_keys_alias_falls_back_to_full_parse(write_config, monkeypatch):
+    text = "defaults: &defaults {port: 5432, host: db}\npostgres:\n  <<: *defaults\n  host: localhost\n"
+    path = write_config(text)
+
+    calls = []
+    load_config = utils.load_config
+    monkeypatch.setattr(utils, "load_config", lambda *args: calls.append(args) or load_config(*args))
+
+    values = utils.load_config_keys("postgres.port", "postgres.host", config_path=path)
+
+    assert calls
+    assert dict(values) == {"postgres.port": 5432, "postgres.host": "localhost"}
+
+
+def test_load_config_keys_nested_request_falls_back(write_config):
+    path = write_config(NESTED_CONFIG)
+
+    values = utils.load_config_keys("postgres", "postgres.port", config_path=path)
+
+    assert _thaw(values["postgres"]) == yaml.safe_load(NESTED_CONFIG)["postgres"]
+    assert values["postgres.port"] == 5432
+
+
+@pytest.mark.parametrize("dotted_path", ["postgres.nope", "nope", "postgres.host.deeper", "last.x"])
+def test_load_config_keys_missing_key(write_config, dotted_path):
+    path = write_config(NESTED_CONFIG)
+
+    with pytest.raises(KeyError):
+        utils.load_config_keys("postgres.host", dotted_path, config_path=path)
+
+
+def test_load_config_keys_is_cached_until_the_file_changes(write_config):
+    path = write_config("a: 1\n")
+    first = utils.load_config_keys("a", config_path=path)
+
+    assert utils.load_config_keys("a", config_path=path) is first
+
+    write_config("a: 2\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+    assert utils.load_config_keys("a", config_path=path)["a"] == 2
+
+
+def test_load_config_keys_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        utils.load_config_keys("a", config_path=str(tmp_path / "missing.yaml"))
+
+
+# =========================
+# _BufferedRotatingFileHandler
+# =========================
+
+@pytest.fixture
+def file_logger(tmp_path):
+    handlers = []
+
+    def _make(max_bytes=0, backup_count=0):
+        handler = utils._BufferedRotatingFileHandler(str(tmp_path / "etl.log"), max_bytes, backup_count)
+        handler.setFormatter(logging.Formatter("{message}", style="{"))
+        handlers.append(handler)
+
+        logger = logging.getLogger(f"test_utils.file_logger.{len(handlers)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        return logger, handler
+
+    yield _make
+    for handler in handlers:
+        handler.close()
+
+
+def test_rotating_handler_rolls_over_on_record_boundaries(tmp_path, file_logger):
+    # 49 characters + newline = 50 bytes per record, 10 records fit into max_bytes=500
+    logger, handler = file_logger(max_bytes=500, backup_count=20)
+    records = [f"record {i:04d} ".ljust(49, "x") for i in range(100)]
+
+    for record in records:
+        logger.info(record)
+    handler.close()
+
+    log_file = tmp_path / "etl.log"
+    backups = sorted(tmp_path.glob("etl.log.*"), key=lambda path: int(path.suffix[1:]), reverse=True)
+    assert len(backups) == 9
+
+    written = []
+    for path in [*backups, log_file]:
+        content = path.read_bytes()
+        assert len(content) <= 500
+        assert content.endswith(b"\n")
+        written.extend(content.decode().splitlines())
+
+    # Oldest backup first: every record exactly once, in order, none split across two files
+    assert written == records
+
+
+def test_rotating_handler_keeps_backup_count(tmp_path, file_logger):
+    logger, handler = file_logger(max_bytes=100, backup_count=2)
+
+    for i in range(50):
+        logger.info(f"record {i:04d}")
+    handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["etl.log", "etl.log.1", "etl.log.2"]
+
+
+def test_rotating_handler_flushes_error_records_immediately(tmp_path, file_logger):
+    logger, handler = file_logger()
+    log_file = tmp_path / "etl.log"
+
+    logger.info("buffered")
+    assert log_file.read_text() == ""
+
+    logger.error("failed")
+    assert log_file.read_text() == "buffered\nfailed\n"
+
+
+def test_rotating_handler_without_max_bytes_never_rotates(tmp_path, file_logger):
+    logger, handler = file_logger()
+
+    for i in range(2000):
+        logger.info(f"record {i:04d} ".ljust(99, "x"))
+    handler.close()
+
+    assert [path.name for path in tmp_path.iterdir()] == ["etl.log"]
+    assert len((tmp_path / "etl.log").read_bytes()) == 2000 * 100
+
+
+# =========================
+# SIGTERM handling
+# =========================
+
+def _run_logging_process(tmp_path, install_handler):
+    log_file = tmp_path / "etl.log"
+    script = textwrap.dedent(f"""
+        import os, signal, sys, time
+        sys.path.insert(0, {os.path.dirname(utils.__file__)!r})
+        import utils
+
+        if {install_handler!r}:
+            utils.exit_on_sigterm()
+        logger = utils.setup_logging({str(log_file)!r})
+        logger.info("before sigterm")
+        print(signal.getsignal(signal.SIGTERM) is signal.SIG_DFL, flush=True)
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(10)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    return result, log_file
+
+
+def test_setup_logging_installs_no_signal_handler(tmp_path):
+    result, _ = _run_logging_process(tmp_path, install_handler=False)
+
+    assert result.stdout.strip() == "True"
+    assert result.returncode == -signal.SIGTERM
+
+
+def test_exit_on_sigterm_flushes_buffered_records(tmp_path):
+    result, log_file = _run_logging_process(tmp_path, install_handler=True)
+
+    assert result.stdout.strip() == "False"
+    assert result.returncode == 128 + signal.SIGTERM
+    assert "before sigterm" in log_file.read_text()
+
+
+# =========================
+# setup_logging() level
+# =========================
+
+@pytest.mark.parametrize("level", ["VERBOSE", "info ", "", "getLogger"])
+def test_invalid_logging_level_is_rejected(tmp_path, level):
+    # Raised before any handler is built, nothing is attached to the root logger
+    handlers = list(logging.getLogger().handlers)
+
+    with pytest.raises(ValueError, match="Invalid logging level"):
+        utils._setup_once(str(tmp_path / "etl.log"), level, 0, 0)
+
+    assert logging.getLogger().handlers == handlers
+
+
+@pytest.mark.parametrize("level, expected", [("warning", logging.WARNING), ("DEBUG", logging.DEBUG),
+                                             ("Critical", logging.CRITICAL)])
+def test_logging_level_is_looked_up_case_insensitively(tmp_path, level, expected):
+    script = textwrap.dedent(f"""
+        import logging, sys
+        sys.path.insert(0, {os.path.dirname(utils.__file__)!r})
+        import utils
+
+        print(utils.setup_logging({str(tmp_path / "etl.log")!r}, {level!r}).level)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+
+    assert result.stdout.strip() == str(expected)